@@ -1,3 +1,14 @@
+from bisect import bisect_left, bisect_right, insort
+import mmap
+import os
+import re
+import time
+
+from input_cache import cached_input
+import profiling
+
+@profiling.timed
+@cached_input
 def get_input(input_file: str='Inputs/Day1_Inputs.txt') -> list:
     """
     Parse an input file to extract a list of movement instructions.
@@ -20,7 +31,157 @@ def get_input(input_file: str='Inputs/Day1_Inputs.txt') -> list:
 
     return instructions
 
-def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
+def parse_instructions(instructions: list):
+    """
+    Lazily convert a list of movement instructions in the form 'R3' into (turn, distance) pairs.
+
+    Parameters
+    ----------
+    instructions : list(str)
+        List of instructions.
+
+    Yields
+    ------
+    turn : int
+        Direction of the turn, 1 for right and -1 for left.
+    distance : int
+        Number of spaces to move after turning.
+
+    """
+    for instruction in instructions:
+        yield (1 if instruction[0] == 'R' else -1), int(instruction[1:])
+
+# Pattern matching a single instruction in the raw bytes of an input file
+INSTRUCTION_PATTERN = re.compile(rb'([LR])(\d+)')
+
+def iter_instructions(input_file: str='Inputs/Day1_Inputs.txt'):
+    """
+    Lazily parse an input file of movement instructions into (turn, distance) pairs, scanning a
+    memory map of the file rather than reading it into memory, so that memory use is constant
+    however large the file is. As the whole file is scanned as one buffer, no instruction can be
+    split between reads.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the instructions.
+        The default is 'Inputs/Day1_Inputs.txt'.
+
+    Yields
+    ------
+    turn : int
+        Direction of the turn, 1 for right and -1 for left.
+    distance : int
+        Number of spaces to move after turning.
+
+    """
+    with open(input_file, 'rb') as f:
+        # Empty files can't be memory mapped, but contain no instructions anyway
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            for match in INSTRUCTION_PATTERN.finditer(mapped_file):
+                yield (1 if match[1] == b'R' else -1), int(match[2])
+
+def read_instructions(input_file: str='Inputs/Day1_Inputs.txt', stream: bool=False):
+    """
+    Read the movement instructions from an input file as (turn, distance) pairs, either by
+    parsing the whole file at once with get_input, or by streaming them with iter_instructions.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the instructions.
+        The default is 'Inputs/Day1_Inputs.txt'.
+    stream : bool, optional
+        Whether or not to stream the instructions from the file with constant memory.
+        The default is False.
+
+    Returns
+    -------
+    instructions : iterator(tuple(int, int))
+        Iterator over the (turn, distance) pairs of each instruction.
+
+    """
+    if stream:
+        return iter_instructions(input_file)
+
+    return parse_instructions(get_input(input_file))
+
+@profiling.timed
+@cached_input
+def load_instruction_arrays(input_file: str='Inputs/Day1_Inputs.txt') -> tuple:
+    """
+    Parse an input file of movement instructions straight into NumPy arrays of turns and
+    distances, without building a Python object for each instruction.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the instructions.
+        The default is 'Inputs/Day1_Inputs.txt'.
+
+    Returns
+    -------
+    turns : numpy.ndarray(int)
+        Direction of each turn, 1 for right and -1 for left.
+    distances : numpy.ndarray(int)
+        Number of spaces to move after each turn.
+
+    """
+    # NumPy is only needed by this method, so is only imported when it is used
+    import numpy as np
+
+    with open(input_file, 'rb') as f:
+        raw = f.read()
+
+    # The turns are given by the letters in the file
+    chars = np.frombuffer(raw, dtype=np.uint8)
+    letters = chars[(chars == ord('R')) | (chars == ord('L'))]
+    turns = np.where(letters == ord('R'), 1, -1)
+
+    # The distances are what remains once the letters and commas are blanked out
+    distances = np.fromstring(raw.translate(bytes.maketrans(b',LR', b'   ')), dtype=np.int64,
+                              sep=' ')
+
+    return turns, distances
+
+def final_position_numpy(turns, distances) -> list:
+    """
+    Find the position reached after following a series of movement instructions with vectorized
+    NumPy operations. Turns are encoded as +/-1, so the facing after each instruction is the
+    cumulative sum of the turns mod 4. Each facing is mapped to a unit vector, and the final
+    position is the dot product of the distances with these vectors.
+
+    Parameters
+    ----------
+    turns : numpy.ndarray(int)
+        Direction of each turn, 1 for right and -1 for left.
+    distances : numpy.ndarray(int)
+        Number of spaces to move after each turn.
+
+    Returns
+    -------
+    position : list(int)
+        Coordinates of the final position.
+
+    """
+    import numpy as np
+
+    # Find the facing after each turn, with North, East, South and West denoted as 0, 1, 2 and 3
+    facings = np.cumsum(turns)%4
+
+    # Unit vector of movement for each facing
+    unit_vectors = np.array([[1, 0], [0, 1], [-1, 0], [0, -1]], dtype=np.int64)
+
+    # Sum the distances moved along each unit vector
+    position = [int(p) for p in distances @ unit_vectors[facings]]
+
+    return position
+
+@profiling.timed
+def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt', method: str='loop',
+               stream: bool=False) -> int:
     """
     Find the Manhattan distance reached from the starting position after following all the movement
     instructions given in an input file. Instructions are in the form 'R3' where the letter ('R' or
@@ -32,6 +193,15 @@ def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
     input_file : str, optional
         Input file containing the instructions.
         The default is 'Inputs/Day1_Inputs.txt'.
+    method : str, optional
+        Method used to follow the instructions, either 'loop' to follow them one at a time, or
+        'numpy' to parse them into arrays and follow them all at once with vectorized operations
+        (see final_position_numpy). The 'numpy' method always reads the whole file, ignoring
+        stream.
+        The default is 'loop'.
+    stream : bool, optional
+        Whether or not to stream the instructions from the file with constant memory.
+        The default is False.
 
     Returns
     -------
@@ -40,32 +210,207 @@ def Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt') -> int:
         instructions.
 
     """
+    # Follow all instructions at once if requested
+    if method == 'numpy':
+        # Calculate absolute sum of movements in each axis from starting position
+        total_distance = sum(abs(p) for p in
+                             final_position_numpy(*load_instruction_arrays(input_file)))
+        return total_distance
+
     # Parse input file and extract instructions
-    instructions = get_input(input_file)
+    instructions = read_instructions(input_file, stream)
 
     # Begin facing North (0) and at the starting position [0, 0]
     facing, position = 0, [0, 0]
 
     # Follow every instuction
-    for instruction in instructions:
+    for turn, distance in instructions:
         # Rotate the facing accordingly, with North, East, South and West denoted as 0, 1, 2 and 3
-        if instruction[0] == 'L':
-            facing = (facing - 1)%4
-        else:
-            facing = (facing + 1)%4
+        facing = (facing + turn)%4
         # If facing North or East, add to the corresponding coordinate
         if facing < 2:
-            position[facing] += int(instruction[1:])
+            position[facing] += distance
         # Else subtract from the corresponding coordinate
         else:
-            position[facing - 2] -= int(instruction[1:])
+            position[facing - 2] -= distance
 
     # Finally, calculate absolute sum of movements in each axis from starting position
     total_distance = sum(abs(p) for p in position)
 
     return total_distance
 
-def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt') -> int:
+class CrossingIndex:
+    """
+    Class indexing straight segments along one axis, to find which of them a perpendicular segment
+    crosses first. The index is a segment tree over the coordinates along the axis, where each
+    segment is stored, by the coordinate it is fixed at on the other axis, in the O(log n) nodes
+    covering its range. The segments covering a location along the axis are then exactly those
+    stored in the nodes on the path from its leaf to the root, so the nearest one within a range of
+    fixed coordinates is found with one binary search per node, in O(log^2 n) time.
+    """
+    def __init__(self, coords: list):
+        """
+        Parameters
+        ----------
+        coords : list(int)
+            Every coordinate along the axis which may be the end of a segment or be queried.
+
+        """
+        self.coords = sorted(set(coords))
+        self.size = 1 << max(len(self.coords) - 1, 0).bit_length()
+        # Sorted fixed coordinates of the segments stored in each node, created as needed
+        self.nodes = {}
+
+    def add(self, low: int, high: int, fixed: int) -> None:
+        """
+        Adds a segment to the index.
+
+        Parameters
+        ----------
+        low : int
+            Lowest coordinate covered along the axis.
+        high : int
+            Highest coordinate covered along the axis.
+        fixed : int
+            Coordinate of the segment on the other axis.
+
+        Returns
+        -------
+        None.
+
+        """
+        # Store the segment in the nodes exactly covering its range of leaves
+        left = bisect_left(self.coords, low) + self.size
+        right = bisect_right(self.coords, high) + self.size
+        while left < right:
+            if left & 1:
+                insort(self.nodes.setdefault(left, []), fixed)
+                left += 1
+            if right & 1:
+                right -= 1
+                insort(self.nodes.setdefault(right, []), fixed)
+            left, right = left >> 1, right >> 1
+
+    def first_crossing(self, coord: int, low: int, high: int, sign: int) -> int:
+        """
+        Finds the first segment crossed by a perpendicular movement, at a given coordinate along
+        the axis, over a range of coordinates on the other axis.
+
+        Parameters
+        ----------
+        coord : int
+            Coordinate of the movement along the axis.
+        low : int
+            Lowest coordinate covered by the movement on the other axis.
+        high : int
+            Highest coordinate covered by the movement on the other axis.
+        sign : int
+            Direction of the movement, 1 from low to high or -1 from high to low.
+
+        Returns
+        -------
+        crossing : int or None
+            Fixed coordinate of the first segment crossed, or None if none is crossed.
+
+        """
+        # Only coordinates given to the index can be covered by a segment
+        if (leaf := bisect_left(self.coords, coord)) == len(self.coords) \
+            or self.coords[leaf] != coord:
+            return None
+
+        # Find the nearest crossing within the range among the segments of each node on the path
+        crossing, node = None, leaf + self.size
+        while node:
+            if (fixed_coords := self.nodes.get(node)) is not None:
+                if sign > 0:
+                    i = bisect_left(fixed_coords, low)
+                    if i < len(fixed_coords) and fixed_coords[i] <= high \
+                        and (crossing is None or fixed_coords[i] < crossing):
+                        crossing = fixed_coords[i]
+                else:
+                    i = bisect_right(fixed_coords, high) - 1
+                    if i >= 0 and fixed_coords[i] >= low \
+                        and (crossing is None or fixed_coords[i] > crossing):
+                        crossing = fixed_coords[i]
+            node >>= 1
+
+        return crossing
+
+def find_first_revisit(instructions: list) -> list:
+    """
+    Find the first location visited twice after following a list of movement instructions, by
+    treating each instruction as a straight segment and checking it against an index of all
+    previous segments, rather than recording every location visited. Crossings with perpendicular
+    segments are found with a CrossingIndex, so time and memory depend on the number of
+    instructions, in O(n log^2 n) time, rather than on the distance travelled.
+
+    Parameters
+    ----------
+    instructions : iterable(tuple(int, int))
+        (turn, distance) pairs of each instruction, where the turn is 1 for right and -1 for left.
+
+    Returns
+    -------
+    position : list(int) or None
+        Coordinates of the first location visited twice, or None if no location is visited twice.
+
+    """
+    # Begin facing North (0) and at the starting position [0, 0]
+    facing, position = 0, [0, 0]
+
+    # Find the segment of each instruction first, so the coordinates of the indexes are known. Each
+    # segment covers every location after the current one up to the end of the movement
+    moves = []
+    for turn, distance in instructions:
+        # Rotate the facing accordingly, with North, East, South and West denoted as 0, 1, 2 and 3
+        facing = (facing + turn)%4
+        # Find the axis moved along and the direction moved
+        axis, sign = facing%2, 1 if facing < 2 else -1
+        if distance == 0:
+            continue
+        start, fixed = position[axis], position[1 - axis]
+        low, high = (start + 1, start + distance) if sign > 0 else (start - distance, start - 1)
+        moves.append((axis, sign, start, fixed, low, high))
+        position[axis] += sign*distance
+
+    # For segments moving along each axis, map the fixed coordinate of each segment to a list of
+    # (lowest, highest) coordinates covered along the axis, and index them for crossings by
+    # every coordinate along the axis which a segment ends at or a perpendicular segment is fixed at
+    segments = [{}, {}]
+    coords = [[], []]
+    for axis, _, _, fixed, low, high in moves:
+        coords[axis] += (low, high)
+        coords[1 - axis].append(fixed)
+    crossings = [CrossingIndex(coords[0]), CrossingIndex(coords[1])]
+
+    # Follow every instruction
+    for axis, sign, start, fixed, low, high in moves:
+        # Find the smallest number of steps taken before reaching a location already visited
+        steps = None
+        # Check overlaps with previous segments along the same line
+        for prev_low, prev_high in segments[axis].get(fixed, []):
+            if (overlap_low := max(low, prev_low)) <= (overlap_high := min(high, prev_high)):
+                overlap_steps = overlap_low - start if sign > 0 else start - overlap_high
+                steps = overlap_steps if steps is None else min(steps, overlap_steps)
+        # Check the first crossing with previous perpendicular segments within the covered range
+        if (cross := crossings[1 - axis].first_crossing(fixed, low, high, sign)) is not None:
+            cross_steps = abs(cross - start)
+            steps = cross_steps if steps is None else min(steps, cross_steps)
+
+        # If any location was visited before, the closest one is the first revisit
+        if steps is not None:
+            position[axis], position[1 - axis] = start + sign*steps, fixed
+            return position
+
+        # Else add the segment to the indexes
+        segments[axis].setdefault(fixed, []).append((low, high))
+        crossings[axis].add(low, high, fixed)
+
+    return None
+
+@profiling.timed
+def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt', method: str='steps',
+               stream: bool=False) -> int:
     """
     Find the Manhattan distance from the starting position of the first location visited twice,
     after following all the movement instructions given in an input file. Instructions are in the
@@ -77,6 +422,14 @@ def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt') -> int:
     input_file : str, optional
         Input file containing the instructions.
         The default is 'Inputs/Day1_Inputs.txt'.
+    method : str, optional
+        Method used to find the first location visited twice, either 'steps' to record every
+        location visited one step at a time, or 'segments' to check each instruction as a whole
+        against the previous instructions (see find_first_revisit).
+        The default is 'steps'.
+    stream : bool, optional
+        Whether or not to stream the instructions from the file with constant memory.
+        The default is False.
 
     Returns
     -------
@@ -85,8 +438,16 @@ def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt') -> int:
 
     """
     # Parse input file and extract instructions
-    instructions = get_input(input_file)
-        
+    instructions = read_instructions(input_file, stream)
+
+    # Check whole instructions against each other if requested
+    if method == 'segments':
+        if (position := find_first_revisit(instructions)) is not None:
+            # Return absolute sum of movements in each axis from starting position
+            total_distance = sum(abs(p) for p in position)
+            return total_distance
+        return None
+
     # Begin facing North (0) and at the starting position [0, 0]
     facing, position = 0, [0, 0]
 
@@ -94,14 +455,11 @@ def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt') -> int:
     all_positions = set()
 
     # Follow every instruction
-    for instruction in instructions:
+    for turn, distance in instructions:
         # Rotate the facing accordingly, with North, East, South and West denoted as 0, 1, 2 and 3
-        if instruction[0] == 'L':
-            facing = (facing - 1)%4
-        else:
-            facing = (facing + 1)%4
+        facing = (facing + turn)%4
         # Perform movements one step at a time in order to record every coordinate visited
-        for i in range(int(instruction[1:])):
+        for i in range(distance):
             # If facing North or East, add 1 to the corresponding coordinate
             if facing < 2:
                 position[facing] += 1
@@ -110,9 +468,50 @@ def Day1_Part2(input_file: str='Inputs/Day1_Inputs.txt') -> int:
                 position[facing - 2] -= 1
             # If this position is already in the set of all positions, it has been visited before
             if (position_tuple := tuple(position)) in all_positions:
+                if profiling.enabled:
+                    profiling.count('Day1.steps', i + 1)
                 # Return absolute sum of movements in each axis from starting position
                 total_distance = sum(abs(p) for p in position)
                 return total_distance
             # Else add coordinates to the set
             else:
                 all_positions.add(position_tuple)
+        # Count the steps of each instruction in bulk
+        if profiling.enabled:
+            profiling.count('Day1.steps', distance)
+
+def benchmark_Day1_Part1(input_file: str='Inputs/Day1_Inputs.txt', repeats: int=3) -> dict:
+    """
+    Times each method of Day1_Part1 on the same input file, and checks they all give the same
+    result.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file containing the instructions.
+        The default is 'Inputs/Day1_Inputs.txt'.
+    repeats : int, optional
+        Number of times to run each method, keeping the fastest time.
+        The default is 3.
+
+    Returns
+    -------
+    timings : dict(str: float)
+        Fastest time taken in seconds by each method.
+
+    """
+    timings, results = {}, {}
+    for method in ('loop', 'numpy'):
+        times = []
+        for _ in range(repeats):
+            t0 = time.perf_counter()
+            results[method] = Day1_Part1(input_file, method=method)
+            times.append(time.perf_counter() - t0)
+        timings[method] = min(times)
+        print(f'{method}: {timings[method]:.3f} s')
+
+    # Every method must agree with the loop
+    if len(set(results.values())) > 1:
+        raise ValueError(f'Methods disagree: {results}')
+
+    return timings
@@ -1,3 +1,12 @@
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from input_cache import cached_input
+import profiling
+
+@profiling.timed
+@cached_input
 def get_input(input_file: str='Inputs/Day2_Inputs.txt') -> list:
     """
     Parses an input file to extract a series of lines of instructions.
@@ -20,52 +29,294 @@ def get_input(input_file: str='Inputs/Day2_Inputs.txt') -> list:
 
     return instructions
 
-# Set up dictionary for key coordinates on the keypad
-keypad = {(0, 0): '1',
-          (0, 1): '2',
-          (0, 2): '3',
-          (1, 0): '4',
-          (1, 1): '5',
-          (1, 2): '6',
-          (2, 0): '7',
-          (2, 1): '8',
-          (2, 2): '9'}
+class Keypad:
+    """
+    Class describing a keypad built from a textual layout, such as:
 
-import operator
+        1
+      2 3 4
+    5 6 7 8 9
+      A B C
+        D
 
-def add_tuples(a, b):
+    where every non-space character is a key, keys in neighbouring rows of the same column are
+    vertically adjacent and keys in the same row are horizontally adjacent. The movements between
+    keys are precomputed once into a flat table of integers, so that following instructions only
+    needs one table lookup per character. Movements which would leave the keypad do not occur.
+    Optionally, the transition map of each distinct line can be kept in a bounded least recently
+    used cache, filled in one starting key at a time as the line is followed from each key, so that
+    repeated lines only cost a single lookup and new lines cost no more than without the cache.
     """
-    Adds two tuples together elementwise using map.
+    # Position of each direction within the block of each key in the table
+    DIRECTIONS = 'UDLR'
+    STEP_CODES = bytes.maketrans(DIRECTIONS.encode('ascii'), bytes(range(len(DIRECTIONS))))
+
+    def __init__(self, layout: str, start: str='5', cache_size: int=0):
+        """
+        Parameters
+        ----------
+        layout : str
+            Textual layout of the keypad, with keys separated by spaces. Blank lines are ignored.
+        start : str, optional
+            Key to start from.
+            The default is '5'.
+        cache_size : int, optional
+            Maximum number of line transition maps to cache. If 0, lines are not cached.
+            The default is 0.
+
+        """
+        # Find the position of every key in the layout, numbering the keys in reading order
+        self.keys, positions = [], {}
+        for row, line in enumerate(line for line in layout.split('\n') if line.strip()):
+            for col, char in enumerate(line):
+                if not char.isspace():
+                    positions[(row, col)] = len(self.keys)
+                    self.keys.append(char)
+
+        # Horizontally adjacent keys are separated by the smallest gap between keys on a row
+        step = min((c2 - c1 for (r1, c1), (r2, c2) in zip(positions, list(positions)[1:])
+                    if r1 == r2), default=1)
+
+        # For each key and direction, store the key moved to, multiplied by the number of
+        # directions so that it directly gives the start of the block for that key
+        self.table = []
+        for (row, col), index in positions.items():
+            for d_row, d_col in ((-1, 0), (1, 0), (0, -step), (0, step)):
+                self.table.append(len(self.DIRECTIONS)*positions.get((row + d_row, col + d_col),
+                                                                     index))
+
+        self.start = self.keys.index(start)
+
+        # Set up an empty cache of line transition maps
+        self.clear_cache()
+        self.cache_size = cache_size
+
+    @property
+    def cache_size(self) -> int:
+        """
+        Maximum number of line transition maps to cache. Lowering it discards the least recently
+        used lines until the cache fits.
+        """
+        return self._cache_size
+
+    @cache_size.setter
+    def cache_size(self, cache_size: int) -> None:
+        self._cache_size = cache_size
+        # Discard the least recently used lines until the cache fits within its new size
+        while len(self._cache) > cache_size:
+            self._cache.popitem(last=False)
+
+    def __getstate__(self) -> dict:
+        """
+        Gives the state of the keypad to pickle, such as when sending it to worker processes, with
+        an empty cache in place of the cached transition maps, which may be large.
+
+        Returns
+        -------
+        state : dict
+            Attributes of the keypad.
+
+        """
+        return {**self.__dict__, '_cache': OrderedDict()}
+
+    def run(self, instruction: str, key: int) -> int:
+        """
+        Follows a line of instructions from a given key.
+
+        Parameters
+        ----------
+        instruction : str
+            Line of instructions.
+        key : int
+            Index of the key to start from.
+
+        Returns
+        -------
+        key : int
+            Index of the key reached at the end of the line.
+
+        """
+        # Any character other than a direction would be used as an offset into the table, so reject
+        # the line, raising the same KeyError as looking up an unknown direction
+        if invalid := instruction.strip(self.DIRECTIONS):
+            raise KeyError(invalid[0])
+
+        table = self.table
+        if profiling.enabled:
+            profiling.count('Day2.characters', len(instruction))
+        # Convert the characters of the line to direction codes all at once, then follow them
+        state = len(self.DIRECTIONS)*key
+        for step in instruction.encode('ascii').translate(self.STEP_CODES):
+            state = table[state + step]
+
+        return state//len(self.DIRECTIONS)
+
+    def transition_map(self, instruction: str) -> tuple:
+        """
+        Finds the key reached at the end of a line of instructions from every possible starting
+        key. Since each line starts where the previous line ended, a line acts as a function from
+        starting key to ending key, and so can be computed independently of the other lines.
+
+        Parameters
+        ----------
+        instruction : str
+            Line of instructions.
+
+        Returns
+        -------
+        transition_map : tuple(int)
+            Index of the ending key for each starting key index.
+
+        """
+        return tuple(self.run(instruction, key) for key in range(len(self.keys)))
+
+    def cached_run(self, instruction: str, key: int) -> int:
+        """
+        Follows a line of instructions from a given key, using the cache of previously seen lines.
+        Only the ending key from the given key is found and cached on a miss, rather than the whole
+        transition map of the line. If the cache is full, the least recently used line is
+        discarded.
+
+        Parameters
+        ----------
+        instruction : str
+            Line of instructions.
+        key : int
+            Index of the key to start from.
+
+        Returns
+        -------
+        key : int
+            Index of the key reached at the end of the line.
+
+        """
+        # If the line has been seen before, mark it as most recently used and reuse its ending key
+        # from this key if known
+        if (transition_map := self._cache.get(instruction)) is not None:
+            self._cache.move_to_end(instruction)
+            if (end_key := transition_map[key]) is not None:
+                self.cache_hits += 1
+                return end_key
+        # Else add an empty map of the line to the cache, discarding the least recently used line
+        else:
+            transition_map = self._cache[instruction] = [None]*len(self.keys)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+        # Follow the line from this key and fill in its entry of the map
+        self.cache_misses += 1
+        end_key = transition_map[key] = self.run(instruction, key)
+
+        return end_key
+
+    def cache_info(self) -> dict:
+        """
+        Gives the statistics of the cache of line transition maps, to help tune its size.
+
+        Returns
+        -------
+        cache_info : dict(str: int)
+            Number of hits and misses, counted per line followed from a key, and the current and
+            maximum number of lines cached.
+
+        """
+        return {'hits': self.cache_hits, 'misses': self.cache_misses,
+                'size': len(self._cache), 'max_size': self.cache_size}
+
+    def clear_cache(self) -> None:
+        """
+        Empties the cache of line transition maps and resets its statistics.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._cache, self.cache_hits, self.cache_misses = OrderedDict(), 0, 0
+
+    def code(self, instructions: list, processes: int=1) -> str:
+        """
+        Finds the code given by lines of instructions, where the first line starts from the start
+        key and each following line starts from the key where the previous line ended.
+
+        Parameters
+        ----------
+        instructions : list(str)
+            Lines of instructions.
+        processes : int, optional
+            Number of worker processes to find the ending key of each line with, independently of
+            the other lines (see find_code_parallel).
+            The default is 1.
+
+        Returns
+        -------
+        code : str
+            The code given by the instructions.
+
+        """
+        # Find the ending key of every line in parallel if requested
+        if processes > 1:
+            return find_code_parallel(self, instructions, processes)
+
+        # Starting at the start key with a blank code
+        key, code = self.start, ''
+        # For each line of instructions
+        for instruction in instructions:
+            # Follow the line, from the cached map of the line if caching, and add the key reached
+            # to the end of the code
+            if self.cache_size:
+                key = self.cached_run(instruction, key)
+            else:
+                key = self.run(instruction, key)
+            code += self.keys[key]
+
+        return code
+
+def find_code_parallel(keypad: Keypad, instructions: list, processes: int=None) -> str:
+    """
+    Finds the code given by lines of instructions on a keypad, by finding the transition map of
+    each line in a pool of worker processes, and then applying the maps in order starting from the
+    start key. Applying the maps one after the other is equivalent to composing them, so only one
+    lookup per line is needed once the maps are known.
 
     Parameters
     ----------
-    a : tuple(int)
-        First tuple.
-    b : tuple(int)
-        Second tuple.
+    keypad : Keypad
+        Keypad to follow the instructions on.
+    instructions : list(str)
+        Lines of instructions.
+    processes : int or None, optional
+        Number of worker processes to use. If None, one per CPU is used.
+        The default is None.
 
     Returns
     -------
-    out : tuple(int)
-        Elementwise addition of the input tuples.
+    code : str
+        The code given by the instructions.
 
     """
-    return tuple(map(operator.add, a, b))
-
-# Set up lambda functions for movement by one space in any direction
-# forcing the coordinates to stay within the bounds of the keypad
-move_up = lambda a : add_tuples(a, (-1, 0)) if a[0] > 0 else a
-move_down = lambda a : add_tuples(a, (1, 0)) if a[0] < 2 else a
-move_left = lambda a : add_tuples(a, (0, -1)) if a[1] > 0 else a
-move_right = lambda a : add_tuples(a, (0, 1)) if a[1] < 2 else a
-
-# Dictionary mapping instruction to corresponding lambda function
-moves = {'U': move_up,
-         'D': move_down,
-         'L': move_left,
-         'R': move_right}
-
-def Day2_Part1(input_file: str='Inputs/Day2_Inputs.txt') -> str:
+    key, code = keypad.start, ''
+    with ProcessPoolExecutor(processes := processes or os.cpu_count()) as executor:
+        # Send lines to the workers in chunks to limit communication overhead
+        chunksize = max(1, len(instructions)//(4*processes))
+        for transition_map in executor.map(keypad.transition_map, instructions,
+                                           chunksize=chunksize):
+            # Move to the end of the current line and add the key to the end of the code
+            key = transition_map[key]
+            code += keypad.keys[key]
+
+    return code
+
+# Set up the keypad
+keypad = Keypad('''
+1 2 3
+4 5 6
+7 8 9
+''')
+
+@profiling.timed
+def Day2_Part1(input_file: str='Inputs/Day2_Inputs.txt', processes: int=1,
+               cache_size: int=0) -> str:
     """
     Find the code to unlock a bathroom, by following a set of instructions to move around a keypad
     of the form:
@@ -84,6 +335,16 @@ def Day2_Part1(input_file: str='Inputs/Day2_Inputs.txt') -> str:
     input_file : str, optional
         Input file giving the movement instructions on the keypad.
         The default is 'Inputs/Day2_Inputs.txt'.
+    processes : int, optional
+        Number of worker processes to find the ending key of each line with, independently of the
+        other lines (see find_code_parallel).
+        The default is 1.
+    cache_size : int, optional
+        Maximum number of distinct lines whose ending keys, from each starting key they are
+        followed from, are cached on the keypad, so that repeated lines only cost a single lookup.
+        The cache is kept between calls, and its statistics are given by the keypad's cache_info.
+        If 0, lines are not cached.
+        The default is 0.
 
     Returns
     -------
@@ -94,52 +355,24 @@ def Day2_Part1(input_file: str='Inputs/Day2_Inputs.txt') -> str:
     # Parse input file and extract each line of instructions
     instructions = get_input(input_file)
 
-    # Starting at the number 5 with a blank code
-    coords, code = (1, 1), ''
-    # For each line of instructions
-    for instruction in instructions:
-        # For each character in the line
-        for step in instruction:
-            # Perform a movement according to the instruction character
-            coords = moves[step](coords)
-        # At the end of each line, add the current key to the end of the code
-        code += keypad[coords]
+    # Follow the instructions on the keypad, starting at the number 5
+    keypad.cache_size = cache_size
+    code = keypad.code(instructions, processes)
     
     return code
 
-# Set up dictionary for key coordinates on the new keypad
-new_keypad = {(-2, 0): '1',
-              (-1, -1): '2',
-              (-1, 0): '3',
-              (-1, 1): '4',
-              (0, -2): '5',
-              (0, -1): '6',
-              (0, 0): '7',
-              (0, 1): '8',
-              (0, 2): '9',
-              (1, -1): 'A',
-              (1, 0): 'B',
-              (1, 1): 'C',
-              (2, 0): 'D'}
-
-# Set up lambda functions for movement by one space in any direction
-# forcing the coordinates to stay within the bounds of the new keypad
-new_move_up = lambda a : add_tuples(a, (-1, 0)) \
-                if sum(abs(i) for i in add_tuples(a, (-1, 0))) < 3 else a
-new_move_down = lambda a : add_tuples(a, (1, 0)) \
-                if sum(abs(i) for i in add_tuples(a, (1, 0))) < 3 else a
-new_move_left = lambda a : add_tuples(a, (0, -1)) \
-                if sum(abs(i) for i in add_tuples(a, (0, -1))) < 3 else a
-new_move_right = lambda a : add_tuples(a, (0, 1)) \
-                if sum(abs(i) for i in add_tuples(a, (0, 1))) < 3 else a
-
-# Dictionary mapping instruction to corresponding lambda function
-new_moves = {'U': new_move_up,
-             'D': new_move_down,
-             'L': new_move_left,
-             'R': new_move_right}
-
-def Day2_Part2(input_file: str='Inputs/Day2_Inputs.txt') -> str:
+# Set up the new keypad
+new_keypad = Keypad('''
+    1
+  2 3 4
+5 6 7 8 9
+  A B C
+    D
+''')
+
+@profiling.timed
+def Day2_Part2(input_file: str='Inputs/Day2_Inputs.txt', processes: int=1,
+               cache_size: int=0) -> str:
     """
     Find the code to unlock a bathroom, by following a set of instructions to move around a keypad
     of the form:
@@ -160,6 +393,16 @@ def Day2_Part2(input_file: str='Inputs/Day2_Inputs.txt') -> str:
     input_file : str, optional
         Input file giving the movement instructions on the keypad.
         The default is 'Inputs/Day2_Inputs.txt'.
+    processes : int, optional
+        Number of worker processes to find the ending key of each line with, independently of the
+        other lines (see find_code_parallel).
+        The default is 1.
+    cache_size : int, optional
+        Maximum number of distinct lines whose ending keys, from each starting key they are
+        followed from, are cached on the keypad, so that repeated lines only cost a single lookup.
+        The cache is kept between calls, and its statistics are given by the keypad's cache_info.
+        If 0, lines are not cached.
+        The default is 0.
 
     Returns
     -------
@@ -170,15 +413,8 @@ def Day2_Part2(input_file: str='Inputs/Day2_Inputs.txt') -> str:
     # Parse input file and extract each line of instructions
     instructions = get_input(input_file)
 
-    # Starting at the number 5 with a blank code
-    coords, code = (0, -2), ''
-    # For each line of instructions
-    for instruction in instructions:
-        # For each character in the line
-        for step in instruction:
-            # Perform a movement according to the instruction character
-            coords = new_moves[step](coords)
-        # At the end of each line, add the current key to the end of the code
-        code += new_keypad[coords]
+    # Follow the instructions on the new keypad, starting at the number 5
+    new_keypad.cache_size = cache_size
+    code = new_keypad.code(instructions, processes)
     
     return code
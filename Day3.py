@@ -1,3 +1,13 @@
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import mmap
+import os
+
+from input_cache import cached_input
+import profiling
+
+@profiling.timed
+@cached_input
 def get_input(input_file: str='Inputs/Day3_Inputs.txt', vertical: bool=False) -> list:
     """
     Parses an input file to extract the side length of a series of triangles. By default each row
@@ -40,7 +50,203 @@ def get_input(input_file: str='Inputs/Day3_Inputs.txt', vertical: bool=False) ->
 
     return triangles
 
-def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt') -> int:
+@profiling.timed
+@cached_input
+def get_input_array(input_file: str='Inputs/Day3_Inputs.txt'):
+    """
+    Parses an input file of triangle side lengths straight into an (N, 3) NumPy array, with one
+    row per row of the file, without building any Python objects per row.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the triangle parameters.
+        The default is 'Inputs/Day3_Inputs.txt'.
+
+    Returns
+    -------
+    sides : numpy.ndarray(int)
+        Array of the numbers on each row of the file, unsorted.
+
+    """
+    # NumPy is only needed by this method, so is only imported when it is used
+    import numpy as np
+
+    # Read every whitespace separated number in the file and group them into rows
+    sides = np.fromfile(input_file, dtype=np.int64, sep=' ').reshape(-1, 3)
+
+    return sides
+
+def count_valid_array(sides, vertical: bool=False) -> int:
+    """
+    Counts how many triangles are valid from an array of side lengths with vectorized NumPy
+    operations. If vertical is True, triangles are specified in groups of three vertically, which
+    is handled as a reshaped and transposed view of the array rather than a copy.
+
+    Parameters
+    ----------
+    sides : numpy.ndarray(int)
+        (N, 3) array of the numbers on each row of the input file.
+    vertical : bool, optional
+        Whether the triangles side lengths are grouped vertically or not.
+        The default is False.
+
+    Returns
+    -------
+    num_valid : int
+        The number of valid triangles in the set.
+
+    """
+    import numpy as np
+
+    if vertical:
+        # Split the rows into blocks of 3 rows, ignoring any incomplete block at the end, and swap
+        # the rows and columns of each block so that each row of a block is a triangle
+        sides = sides[:len(sides) - len(sides)%3].reshape(-1, 3, 3).transpose(0, 2, 1)
+
+    # Sort the side lengths of each triangle
+    triangles = np.sort(sides, axis=-1)
+
+    # Find how many have the sum of the smaller two sides as larger than the length of the longest
+    # side - these are valid triangles
+    num_valid = int(np.count_nonzero(triangles[..., 0] + triangles[..., 1] > triangles[..., 2]))
+
+    return num_valid
+
+def find_chunks(input_file: str='Inputs/Day3_Inputs.txt', vertical: bool=False,
+                chunk_size: int=1 << 20) -> list:
+    """
+    Splits an input file into byte ranges of roughly a given size, where each range starts and
+    ends on a line boundary. If vertical is True, each range also contains a whole number of
+    blocks of three rows, so that no triangle is split between ranges.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the triangle parameters.
+        The default is 'Inputs/Day3_Inputs.txt'.
+    vertical : bool, optional
+        Whether the triangles side lengths are grouped vertically or not.
+        The default is False.
+    chunk_size : int, optional
+        Approximate number of bytes in each range.
+        The default is 1 << 20.
+
+    Returns
+    -------
+    chunks : list(tuple(int))
+        List of (start, stop) byte offsets of each range.
+
+    """
+    chunks = []
+    with open(input_file, 'rb') as f:
+        # Empty files can't be memory mapped, but contain no triangles anyway
+        if (size := os.fstat(f.fileno()).st_size) == 0:
+            return chunks
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+            start = 0
+            while start < size:
+                # Extend the range to the end of the line containing the target end
+                stop = mapped_file.find(b'\n', min(start + chunk_size, size) - 1) + 1 or size
+                # Extend the range by whole lines until it contains whole blocks of three rows
+                if vertical:
+                    for _ in range(-mapped_file[start:stop].count(b'\n')%3):
+                        stop = mapped_file.find(b'\n', stop) + 1 or size
+                chunks.append((start, stop))
+                start = stop
+
+    return chunks
+
+def count_valid_chunk(input_file: str, start: int, stop: int, vertical: bool=False) -> int:
+    """
+    Counts how many of the triangles in a byte range of an input file are valid, reading only that
+    range from a memory map of the file.
+
+    Parameters
+    ----------
+    input_file : str
+        Input file giving the triangle parameters.
+    start : int
+        Byte offset of the start of the range, at the start of a line.
+    stop : int
+        Byte offset of the end of the range (exclusive), at the end of a line.
+    vertical : bool, optional
+        Whether the triangles side lengths are grouped vertically or not, in which case the range
+        must contain whole blocks of three rows.
+        The default is False.
+
+    Returns
+    -------
+    num_valid : int
+        The number of valid triangles in the range.
+
+    """
+    with open(input_file, 'rb') as f, \
+        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+        numbers = [int(n) for n in mapped_file[start:stop].split()]
+
+    # If side lengths are vertically grouped, each block of three rows holds three triangles, one
+    # per column, and any incomplete block at the end of the file is ignored
+    if vertical:
+        triangles = (sorted(numbers[i + j:i + 9:3]) for i in range(0, len(numbers) - 8, 9)
+                     for j in range(3))
+    # If the side lengths are horizontally grouped, each row is a triangle
+    else:
+        triangles = (sorted(numbers[i:i + 3]) for i in range(0, len(numbers) - 2, 3))
+
+    # Find how many have the sum of the smaller two sides as larger than the length of the longest
+    # side - these are valid triangles
+    num_valid = sum(t[0] + t[1] > t[2] for t in triangles)
+
+    return num_valid
+
+def count_valid_streaming(input_file: str='Inputs/Day3_Inputs.txt', vertical: bool=False,
+                          chunk_size: int=1 << 20, processes: int=1) -> int:
+    """
+    Counts how many triangles in an input file are valid, reading the file one chunk at a time so
+    that memory use stays flat however large the file is. If more than one process is requested,
+    the chunks are counted in a pool of worker processes, each reading its own chunk from a memory
+    map of the file, and the partial counts are summed.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the triangle parameters.
+        The default is 'Inputs/Day3_Inputs.txt'.
+    vertical : bool, optional
+        Whether the triangles side lengths are grouped vertically or not.
+        The default is False.
+    chunk_size : int, optional
+        Approximate number of bytes in each chunk.
+        The default is 1 << 20.
+    processes : int, optional
+        Number of worker processes to count the chunks with.
+        The default is 1.
+
+    Returns
+    -------
+    num_valid : int
+        The number of valid triangles in the file.
+
+    """
+    # Split the file into chunks of whole triangles
+    starts, stops = zip(*chunks) if (chunks := find_chunks(input_file, vertical, chunk_size)) \
+        else ((), ())
+
+    # Count each chunk in turn on a single core
+    if processes == 1:
+        return sum(map(count_valid_chunk, repeat(input_file), starts, stops, repeat(vertical)))
+
+    # Else spread the chunks over a pool of worker processes
+    with ProcessPoolExecutor(processes) as executor:
+        num_valid = sum(executor.map(count_valid_chunk, repeat(input_file), starts, stops,
+                                     repeat(vertical)))
+
+    return num_valid
+
+@profiling.timed
+def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt', method: str='loop',
+               processes: int=1) -> int:
     """
     Determines how many of a set of triangles, whose side lengths are given in an input file
     arranged such that the side lengths of each triangle are grouped horizontally by row, are valid
@@ -51,6 +257,15 @@ def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt') -> int:
     input_file : str, optional
         Input file giving the triangle side lengths.
         The default is 'Inputs/Day3_Inputs.txt'.
+    method : str, optional
+        Method used to count the valid triangles, either 'loop' to check each triangle in turn,
+        'numpy' to load the file into an array and check every triangle at once (see
+        count_valid_array), or 'stream' to count the file one chunk at a time with flat memory
+        use (see count_valid_streaming).
+        The default is 'loop'.
+    processes : int, optional
+        Number of worker processes to count chunks with when streaming.
+        The default is 1.
 
     Returns
     -------
@@ -58,6 +273,13 @@ def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt') -> int:
         The number of valid triangles in the set.
 
     """
+    # Check every triangle at once if requested
+    if method == 'numpy':
+        return count_valid_array(get_input_array(input_file))
+    # Or count the file one chunk at a time
+    if method == 'stream':
+        return count_valid_streaming(input_file, processes=processes)
+
     # Extract triangle side lengths from input file
     triangles = get_input(input_file)
 
@@ -67,7 +289,9 @@ def Day3_Part1(input_file: str='Inputs/Day3_Inputs.txt') -> int:
 
     return num_valid
 
-def Day3_Part2(input_file: str='Inputs/Day3_Inputs.txt') -> int:
+@profiling.timed
+def Day3_Part2(input_file: str='Inputs/Day3_Inputs.txt', method: str='loop',
+               processes: int=1) -> int:
     """
     Determines how many of a set of triangles, whose side lengths are given in an input file
     arranged such that the side lengths of each triangle are in groups of three vertically, i.e.
@@ -79,6 +303,15 @@ def Day3_Part2(input_file: str='Inputs/Day3_Inputs.txt') -> int:
     input_file : str, optional
         Input file giving the triangle side lengths.
         The default is 'Inputs/Day3_Inputs.txt'.
+    method : str, optional
+        Method used to count the valid triangles, either 'loop' to check each triangle in turn,
+        'numpy' to load the file into an array and check every triangle at once (see
+        count_valid_array), or 'stream' to count the file one chunk at a time with flat memory
+        use (see count_valid_streaming).
+        The default is 'loop'.
+    processes : int, optional
+        Number of worker processes to count chunks with when streaming.
+        The default is 1.
 
     Returns
     -------
@@ -86,6 +319,13 @@ def Day3_Part2(input_file: str='Inputs/Day3_Inputs.txt') -> int:
         The number of valid triangles in the set.
 
     """
+    # Check every triangle at once if requested
+    if method == 'numpy':
+        return count_valid_array(get_input_array(input_file), True)
+    # Or count the file one chunk at a time, in blocks of three rows
+    if method == 'stream':
+        return count_valid_streaming(input_file, True, processes=processes)
+
     # Extract triangle side lengths from input file, with triangle side lengths grouped vertically
     triangles = get_input(input_file, True)
 
@@ -1,5 +1,16 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import Counter, defaultdict
+from itertools import islice
+import mmap
+import os
+import re
+import string
 import typing
 
+from input_cache import cached_input
+import profiling
+
 class Room(typing.NamedTuple):
     """
     Class describing a room with an encrypted name, sector ID and checksum.
@@ -8,6 +19,8 @@ class Room(typing.NamedTuple):
     sector_ID: int
     checksum: str
 
+@profiling.timed
+@cached_input
 def get_input(input_file: str='Inputs/Day4_Inputs.txt') -> list:
     """
     Parse an input file to extract the properties of a set of rooms. Each room consists of an
@@ -39,6 +52,132 @@ def get_input(input_file: str='Inputs/Day4_Inputs.txt') -> list:
 
     return rooms
 
+class RoomStore:
+    """
+    Class storing a set of rooms in columns rather than as one Room object per room, to keep the
+    memory used by large sets of rooms down. The encrypted names are stored end to end in a single
+    bytes buffer with an array of the offset of each name, the sector IDs in an array of unsigned
+    integers, and the checksums end to end in a buffer of fixed width. Indexing or iterating over
+    the store builds Room objects on demand.
+    """
+    CHECKSUM_LENGTH = 5
+
+    def __init__(self, names: bytes, offsets: array, sector_IDs: array, checksums: bytes):
+        """
+        Parameters
+        ----------
+        names : bytes
+            Encrypted names of every room, end to end.
+        offsets : array(int)
+            Offset of the start of each name in the names buffer, followed by the length of the
+            buffer.
+        sector_IDs : array(int)
+            Sector ID of each room.
+        checksums : bytes
+            Checksums of every room, end to end.
+
+        """
+        self.names = names
+        self.offsets = offsets
+        self.sector_IDs = sector_IDs
+        self.checksums = checksums
+
+    def __len__(self) -> int:
+        return len(self.sector_IDs)
+
+    def __getitem__(self, index: int) -> Room:
+        # Allow indexing from the end, as with a list of rooms
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('room index out of range')
+
+        # Slice the name and checksum of the room out of their buffers
+        return Room(self.names[self.offsets[index]:self.offsets[index + 1]].decode('ascii'),
+                    self.sector_IDs[index],
+                    self.checksums[self.CHECKSUM_LENGTH*index:
+                                   self.CHECKSUM_LENGTH*(index + 1)].decode('ascii'))
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+# Pattern matching a room, capturing its encrypted name, sector ID and checksum
+ROOM_PATTERN = re.compile(rb'([a-z-]+)-(\d+)\[([a-z]{5})\]')
+
+@profiling.timed
+@cached_input
+def get_input_store(input_file: str='Inputs/Day4_Inputs.txt') -> RoomStore:
+    """
+    Parse an input file to extract the properties of a set of rooms into a columnar RoomStore, in
+    a single pass over a memory map of the file with a precompiled regular expression.
+
+    Parameters
+    ----------
+    input_file : str, optional
+        Input file giving the room properties.
+        The default is 'Inputs/Day4_Inputs.txt'.
+
+    Returns
+    -------
+    rooms : RoomStore
+        Extracted rooms stored in columns.
+
+    """
+    names, offsets, sector_IDs, checksums = bytearray(), array('Q', [0]), array('I'), bytearray()
+    with open(input_file, 'rb') as f:
+        # Empty files can't be memory mapped, but contain no rooms anyway
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                # Append the properties of each room to the end of their columns
+                for match in ROOM_PATTERN.finditer(mapped_file):
+                    names += match[1]
+                    offsets.append(len(names))
+                    sector_IDs.append(int(match[2]))
+                    checksums += match[3]
+
+    rooms = RoomStore(bytes(names), offsets, sector_IDs, bytes(checksums))
+
+    return rooms
+
+def compute_checksum(encrypted_name: str) -> str:
+    """
+    Computes the correct checksum of an encrypted room name, consisting of the five most common
+    letters in the name, in order, with ties broken by alphabetization. The letters are counted in
+    a single pass into a fixed array of 26 counts, which is then ranked by (-count, letter). Names
+    containing characters other than lowercase letters and dashes are ranked over every character
+    instead, as they don't fit the array.
+
+    Parameters
+    ----------
+    encrypted_name : str
+        Encrypted name of the room.
+
+    Returns
+    -------
+    checksum : str
+        The correct checksum for the name.
+
+    """
+    # Count every character in the name in one pass, then place the letter counts in a fixed array
+    char_counts = Counter(encrypted_name)
+    char_counts.pop('-', None)
+    letter_counts = [0]*26
+    for char, char_count in char_counts.items():
+        if 'a' <= char <= 'z':
+            letter_counts[ord(char) - 97] = char_count
+        else:
+            # Any other character would land at the wrong index, so rank every character by
+            # (-count, character) directly
+            return ''.join(sorted(char_counts, key=lambda char: (-char_counts[char], char))[:5])
+
+    # Sort the letters by descending count - the sort is stable, so letters with equal counts
+    # stay in alphabetical order - and take the first five
+    checksum = ''.join(string.ascii_lowercase[i] for i in
+                       sorted(range(26), key=letter_counts.__getitem__, reverse=True)[:5])
+
+    return checksum
+
 def room_is_real(room):
     """
     Determines whether or not a room is real by checking if the checksum of the room consists of
@@ -56,30 +195,32 @@ def room_is_real(room):
         Whether or not the room is real.
 
     """
-    # Find the counts of each letter in the encrypted room name
-    letter_counts = {l: room.encrypted_name.count(l) for l in room.encrypted_name if l != '-'}
+    if profiling.enabled:
+        profiling.count('Day4.rooms_validated')
+    # Return the result of comparing the correct checksum to the given checksum for the room
+    return room.checksum == compute_checksum(room.encrypted_name)
 
-    # Find all the letters corresponding to each count value found, sorted alphabetically
-    letters_per_count = {count: sorted(l for l, c in letter_counts.items() if c == count) \
-                         for count in letter_counts.values()}
+def real_rooms(rooms: list) -> list:
+    """
+    Finds all the real rooms out of a list of rooms.
 
-    # Sort each found count number in descending order
-    descending_counts = sorted(letters_per_count.keys())[::-1]
+    Parameters
+    ----------
+    rooms : list(Room)
+        List of rooms to test, formatted as Room objects.
 
-    # Starting with blank correct checksum
-    correct_checksum = ''
-    # While the correct checksum is shorter than 5 characters
-    while len(correct_checksum) < 5:
-        # Find the letters corresponding to the next highest occurance in the encrypted name
-        curr_letters = letters_per_count[descending_counts.pop(0)]
-        # Add letters in alphabetical order to the end of the correct checksum up to a maximum
-        # length of 5
-        correct_checksum += ''.join(curr_letters[:5 - len(correct_checksum)])
+    Returns
+    -------
+    real_rooms : list(Room)
+        List of the rooms which are real, in their original order.
 
-    # Return the result of comparing the correct checksum to the given checksum for the room
-    return room.checksum == correct_checksum
+    """
+    if profiling.enabled:
+        profiling.count('Day4.rooms_validated', len(rooms))
+    return [room for room in rooms if room.checksum == compute_checksum(room.encrypted_name)]
 
-def Day4_Part1(input_file: str='Inputs/Day4_Inputs.txt') -> int:
+@profiling.timed
+def Day4_Part1(input_file: str='Inputs/Day4_Inputs.txt', columnar: bool=False) -> int:
     """
     Finds the sum of the sector IDs of the real rooms out a set of rooms given in an input file.
     Each room consists of an encrypted name (lowercase letters separated by dashes) followed by a
@@ -92,6 +233,10 @@ def Day4_Part1(input_file: str='Inputs/Day4_Inputs.txt') -> int:
     input_file : str, optional
         Input file giving the room properties.
         The default is 'Inputs/Day4_Inputs.txt'.
+    columnar : bool, optional
+        Whether to parse the rooms into a compact columnar RoomStore (see get_input_store), rather
+        than a list of Room objects.
+        The default is False.
 
     Returns
     -------
@@ -100,13 +245,20 @@ def Day4_Part1(input_file: str='Inputs/Day4_Inputs.txt') -> int:
 
     """
     # Parse input file and extract room properties
-    rooms = get_input(input_file)
+    rooms = get_input_store(input_file) if columnar else get_input(input_file)
 
     # Sum up sector IDs of rooms passing room_is_real requirement
-    real_room_ID_sum = sum(room.sector_ID for room in rooms if room_is_real(room))
+    real_room_ID_sum = sum(room.sector_ID for room in real_rooms(rooms))
     
     return real_room_ID_sum
 
+# Translation tables decrypting a name for each of the 26 distinct rotations, with dashes
+# becoming spaces
+DECRYPTION_TABLES = [str.maketrans(string.ascii_lowercase + '-',
+                                   string.ascii_lowercase[shift:] + string.ascii_lowercase[:shift]
+                                   + ' ')
+                     for shift in range(26)]
+
 def decrypt_name(room):
     """
     Apply a decryption procedure based on a Caesar cipher to the encrypted name of a room. To 
@@ -125,35 +277,192 @@ def decrypt_name(room):
         The decrypted name.
 
     """
-    # Starting with blank name
-    decrypted_name = ''
-    # For each character in the encrypted name of the room
-    for char in room.encrypted_name:
-        # Replace dashes with spaces
-        if char == '-':
-            decrypted_name += ' '
-        # Rotate all other letters around by the sector ID, wrapping from 'z' back to 'a'
-        else:
-            # Use ord() to convert letter to corresponding integer, transform with -97 so that 'a'
-            # goes to zero, then add sector ID and mod 26 to wrap around, adding back 97 and
-            # converting back to correpsonding decrypted letter with chr()
-            decrypted_name += chr((ord(char)-97+room.sector_ID)%26 + 97)
+    # Only the sector ID mod 26 matters, so translate with the precomputed table for that rotation
+    decrypted_name = room.encrypted_name.translate(DECRYPTION_TABLES[room.sector_ID%26])
 
     return decrypted_name
 
-def Day4_Part2(input_file: str='Inputs/Day4_Inputs.txt') -> int:
+# Translation tables encrypting a name for each of the 26 distinct rotations, reversing the
+# decryption tables
+ENCRYPTION_TABLES = [str.maketrans(string.ascii_lowercase[shift:] + string.ascii_lowercase[:shift]
+                                   + ' ', string.ascii_lowercase + '-')
+                     for shift in range(26)]
+
+class RoomIndex:
+    """
+    Class indexing a list of rooms by rotation (sector ID mod 26) and encrypted name, so that the
+    rooms with a given decrypted name can be found by encrypting the name under each of the 26
+    rotations, rather than by decrypting every room. Prefix and substring queries on the decrypted
+    names are answered with a secondary index of the decrypted names, which is only built the first
+    time it is needed.
+    """
+    def __init__(self, rooms: list):
+        """
+        Parameters
+        ----------
+        rooms : list(Room)
+            List of rooms to index, formatted as Room objects.
+
+        """
+        self.rooms = rooms
+        # Map each (rotation, encrypted name) to the positions of the matching rooms
+        self._index = defaultdict(list)
+        for position, room in enumerate(rooms):
+            self._index[(room.sector_ID%26, room.encrypted_name)].append(position)
+        self._sorted_names = None
+
+    def find(self, decrypted_name: str) -> list:
+        """
+        Finds every room whose decrypted name is exactly a given name.
+
+        Parameters
+        ----------
+        decrypted_name : str
+            Decrypted name to search for, with words separated by spaces.
+
+        Returns
+        -------
+        rooms : list(Room)
+            List of the matching rooms, in their original order.
+
+        """
+        # Encrypt the name under each rotation and look up the rooms with that rotation and name
+        positions = []
+        for shift, table in enumerate(ENCRYPTION_TABLES):
+            positions += self._index.get((shift, decrypted_name.translate(table)), [])
+
+        return [self.rooms[position] for position in sorted(positions)]
+
+    def _build_secondary_index(self) -> None:
+        # Decrypt every name once, keeping them sorted for prefix searches, and joined in room
+        # order with the starting offset of each name for substring searches
+        decrypted_names = [decrypt_name(room) for room in self.rooms]
+        self._sorted_names = sorted((name, position)
+                                    for position, name in enumerate(decrypted_names))
+        self._joined_names = '\n'.join(decrypted_names)
+        self._offsets, offset = [], 0
+        for name in decrypted_names:
+            self._offsets.append(offset)
+            offset += len(name) + 1
+
+    def find_prefix(self, prefix: str) -> list:
+        """
+        Finds every room whose decrypted name starts with a given prefix.
+
+        Parameters
+        ----------
+        prefix : str
+            Prefix of the decrypted name to search for, with words separated by spaces.
+
+        Returns
+        -------
+        rooms : list(Room)
+            List of the matching rooms, in their original order.
+
+        """
+        if self._sorted_names is None:
+            self._build_secondary_index()
+
+        # The matching names form a contiguous run of the sorted names, starting from the first
+        # name not before the prefix
+        positions = []
+        for name, position in islice(self._sorted_names,
+                                     bisect_left(self._sorted_names, (prefix,)), None):
+            if not name.startswith(prefix):
+                break
+            positions.append(position)
+
+        return [self.rooms[position] for position in sorted(positions)]
+
+    def find_substring(self, substring: str) -> list:
+        """
+        Finds every room whose decrypted name contains a given substring.
+
+        Parameters
+        ----------
+        substring : str
+            Substring of the decrypted name to search for, with words separated by spaces.
+
+        Returns
+        -------
+        rooms : list(Room)
+            List of the matching rooms, in their original order.
+
+        """
+        if self._sorted_names is None:
+            self._build_secondary_index()
+
+        rooms, offset = [], 0
+        # Search the joined names, finding which room each match falls in from the offsets
+        while (match := self._joined_names.find(substring, offset)) != -1:
+            position = bisect_right(self._offsets, match) - 1
+            rooms.append(self.rooms[position])
+            # Continue from the start of the next name, so each room is only found once
+            if position + 1 == len(self._offsets):
+                break
+            offset = self._offsets[position + 1]
+
+        return rooms
+
+def iter_decrypted_names(rooms, batch_size: int=10000):
+    """
+    Lazily decrypts the names of a series of rooms in bulk. Rooms are taken in batches, and the
+    rooms in each batch are grouped by rotation (sector ID mod 26), so that the names of each group
+    can be decrypted together with a single translation. Rooms are still yielded in their original
+    order.
+
+    Parameters
+    ----------
+    rooms : iterable(Room)
+        The rooms whose names should be decrypted.
+    batch_size : int, optional
+        Number of rooms decrypted together.
+        The default is 10000.
+
+    Yields
+    ------
+    decrypted_name : str
+        The decrypted name of a room.
+    room : Room
+        The corresponding room.
+
+    """
+    rooms = iter(rooms)
+    while batch := list(islice(rooms, batch_size)):
+        # Group the positions of the rooms in the batch by rotation
+        shift_groups = defaultdict(list)
+        for i, room in enumerate(batch):
+            shift_groups[room.sector_ID%26].append(i)
+
+        # Join the names of each group with newlines, which are not changed by the translation,
+        # decrypt them all at once and split them back up into their rooms' positions
+        decrypted_names = [None]*len(batch)
+        for shift, group in shift_groups.items():
+            for i, decrypted_name in zip(group, '\n'.join(batch[i].encrypted_name for i in group)
+                                         .translate(DECRYPTION_TABLES[shift]).split('\n')):
+                decrypted_names[i] = decrypted_name
+
+        yield from zip(decrypted_names, batch)
+
+@profiling.timed
+def Day4_Part2(input_file: str='Inputs/Day4_Inputs.txt', columnar: bool=False) -> int:
     """
     Finds the sector ID of the room in an information kiosk where the North Pole objects are stored,
     where room properties are given in an input file, but room names are encrypted. Room names are
     decrypted using a Caesar cipher, where the key is the room's sector ID, so each letter is
     rotated forward through the alphabet a number of times equal to the room's sector ID. A becomes
-    B, B becomes C, Z becomes A, and so on. Dashes become spaces.
+    B, B becomes C, Z becomes A, and so on. Dashes become spaces. If more than one room is for North
+    Pole object storage, the first in the file is taken.
 
     Parameters
     ----------
     input_file : str, optional
         Input file giving the room properties.
         The default is 'Inputs/Day4_Inputs.txt'.
+    columnar : bool, optional
+        Whether to parse the rooms into a compact columnar RoomStore (see get_input_store), rather
+        than a list of Room objects.
+        The default is False.
 
     Returns
     -------
@@ -162,12 +471,14 @@ def Day4_Part2(input_file: str='Inputs/Day4_Inputs.txt') -> int:
 
     """
     # Parse input file and extract room properties
-    rooms = get_input(input_file)
+    rooms = get_input_store(input_file) if columnar else get_input(input_file)
 
-    # Decrypt each room's name and map to sector ID in dictionary
-    decrypted_name_IDs = {decrypt_name(room): room.sector_ID for room in rooms}
+    # Decrypt the room names in bulk, stopping at the first North Pole object storage room
+    # designated 'northpole object storage'
+    for decrypted_name, room in iter_decrypted_names(rooms):
+        if decrypted_name == 'northpole object storage':
+            northpole_object_storage_ID = room.sector_ID
+            return northpole_object_storage_ID
 
-    # Find the sector ID of the North Pole object storage room designated 'northpole object storage'
-    northpole_object_storage_ID = decrypted_name_IDs['northpole object storage']
-    
-    return northpole_object_storage_ID
+    # As when looking the name up, fail if there is no such room
+    raise KeyError('northpole object storage')
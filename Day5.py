@@ -1,7 +1,895 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from hashlib import md5
-import numpy as np
+from itertools import count, islice
+import fcntl
+import json
+import math
+import os
+import random
+import threading
+import time
+
+import profiling
+
+def iter_interesting_hashes(door_ID: str, start: int=0, prefix_zeros: int=5, stop: int=None):
+    """
+    Lazily finds every index, starting from a given index, for which the MD5 hash of the door ID
+    and the index has a hexadecimal representation starting with a given number of zeroes. The
+    hashing state for the door ID is computed once and copied for each index, and the zeroes are
+    checked on the raw bytes of the digest rather than on its hexadecimal representation.
+
+    Parameters
+    ----------
+    door_ID : str
+        ID of the door to be opened.
+    start : int, optional
+        First index to check.
+        The default is 0.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash must start with.
+        The default is 5.
+    stop : int or None, optional
+        Index at which to stop checking (exclusive). If None, checking continues forever.
+        The default is None.
+
+    Yields
+    ------
+    index : int
+        Index giving a matching hash.
+    digest : bytes
+        Raw digest of the matching hash.
+
+    """
+    # Hash the door ID once, so that only the index needs hashing for each candidate
+    door_hash = md5(door_ID.encode('utf-8'))
+
+    # Every pair of zeroes is a whole zero byte, and an odd zero is a byte below 16
+    zero_bytes, odd_zero = bytes(prefix_zeros//2), prefix_zeros%2
+    num_zero_bytes = len(zero_bytes)
+
+    for i in (range(start, stop) if stop is not None else count(start)):
+        # Copy the door ID hashing state and add the current index
+        index_hash = door_hash.copy()
+        index_hash.update(b'%d' % i)
+        # Check the leading bytes of the digest
+        if (digest := index_hash.digest()).startswith(zero_bytes) \
+            and not (odd_zero and digest[num_zero_bytes] > 15):
+            yield i, digest
+
+def search_block(door_ID: str, start: int, stop: int, prefix_zeros: int=5) -> list:
+    """
+    Finds every index in a given range for which the MD5 hash of the door ID and the index has a
+    hexadecimal representation starting with a given number of zeroes.
+
+    Parameters
+    ----------
+    door_ID : str
+        ID of the door to be opened.
+    start : int
+        First index to check.
+    stop : int
+        Index at which to stop checking (exclusive).
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash must start with.
+        The default is 5.
+
+    Returns
+    -------
+    hits : list(tuple(int, str))
+        List of (index, hash) pairs for every matching index, in ascending index order.
+
+    """
+    # Only build the hexadecimal representation of the matching hashes
+    hits = [(i, digest.hex()) for i, digest in iter_interesting_hashes(door_ID, start,
+                                                                       prefix_zeros, stop)]
+
+    return hits
+
+# Per-step shift amounts and additive constants of the MD5 algorithm
+MD5_SHIFTS = [7, 12, 17, 22]*4 + [5, 9, 14, 20]*4 + [4, 11, 16, 23]*4 + [6, 10, 15, 21]*4
+MD5_CONSTANTS = [int(abs(math.sin(i + 1))*2**32) & 0xFFFFFFFF for i in range(64)]
+
+def md5_first_words(prefix: bytes, indices):
+    """
+    Computes the first 32-bit word of the MD5 digests of a prefix followed by each of an array of
+    integer indices, vectorized across the indices with NumPy. Every index must have the same
+    number of digits, and the resulting messages must fit in a single 64-byte MD5 block.
+
+    Parameters
+    ----------
+    prefix : bytes
+        Bytes preceding each index in the messages.
+    indices : numpy.ndarray(int)
+        Indices to hash, all with the same number of digits.
+
+    Returns
+    -------
+    first_words : numpy.ndarray(numpy.uint32)
+        First word of each digest, as a little-endian integer (so the first byte of the digest is
+        the lowest byte).
 
-def Day5_Part1(door_ID: str='uqwqemis') -> str:
+    """
+    # NumPy is only needed by this backend, so is only imported when it is used
+    import numpy as np
+
+    # Find the length of each message, which must leave room for the padding and length
+    num_digits = len(str(int(indices[0])))
+    if (length := len(prefix) + num_digits) > 55:
+        raise ValueError(f'Message length {length} does not fit in a single MD5 block')
+
+    # Build the padded block for every message: the prefix, the index digits, a 1 bit, zeroes and
+    # finally the length in bits
+    blocks = np.zeros((len(indices), 64), dtype=np.uint8)
+    blocks[:, :len(prefix)] = np.frombuffer(prefix, dtype=np.uint8)
+    for k in range(num_digits):
+        blocks[:, len(prefix) + k] = indices//10**(num_digits - 1 - k)%10 + ord('0')
+    blocks[:, length] = 0x80
+    blocks[:, 56:] = np.frombuffer((8*length).to_bytes(8, 'little'), dtype=np.uint8)
+    words = blocks.view('<u4')
+
+    # Words shared by every message are used as scalars to save work
+    message = [words[0, g] if (words[:, g] == words[0, g]).all() else words[:, g].copy()
+               for g in range(16)]
+
+    # Starting from the MD5 initial state
+    a, b, c, d = (np.uint32(x) for x in (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476))
+    # The first word of the digest is only affected up to step 60, as the final three steps only
+    # change the other words. All additions wrap around modulo 2**32 as intended
+    with np.errstate(over='ignore'):
+        first_words = md5_steps(a, b, c, d, message)
+
+    # If every word was shared, as for a single index, the digest is a scalar, so give one per index
+    return np.broadcast_to(first_words, indices.shape)
+
+def md5_steps(a, b, c, d, message: list):
+    """
+    Applies the first 61 steps of the MD5 compression function to a state, and returns the first
+    word of the resulting digest.
+
+    Parameters
+    ----------
+    a, b, c, d : numpy.uint32 or numpy.ndarray(numpy.uint32)
+        Initial state words.
+    message : list(numpy.uint32 or numpy.ndarray(numpy.uint32))
+        The 16 words of the message block.
+
+    Returns
+    -------
+    first_word : numpy.ndarray(numpy.uint32)
+        First word of the digest.
+
+    """
+    import numpy as np
+
+    for i in range(61):
+        # Apply the round function and choose the message word for the current step
+        if i < 16:
+            f, g = (b & c) | (~b & d), i
+        elif i < 32:
+            f, g = (d & b) | (~d & c), (5*i + 1)%16
+        elif i < 48:
+            f, g = b ^ c ^ d, (3*i + 5)%16
+        else:
+            f, g = c ^ (b | ~d), (7*i)%16
+        f = f + a + np.uint32(MD5_CONSTANTS[i]) + message[g]
+        shift = MD5_SHIFTS[i]
+        a, d, c, b = d, c, b, b + ((f << np.uint32(shift)) | (f >> np.uint32(32 - shift)))
+
+    # Add the initial state back onto the word
+    first_word = np.uint32(0x67452301) + b
+
+    return first_word
+
+def search_block_numpy(door_ID: str, start: int, stop: int, prefix_zeros: int=5,
+                       batch_size: int=65536) -> list:
+    """
+    Finds every index in a given range for which the MD5 hash of the door ID and the index has a
+    hexadecimal representation starting with a given number of zeroes, by screening batches of
+    indices with a vectorized NumPy implementation of MD5 and confirming the few candidates found
+    with hashlib. Gives identical results to search_block.
+
+    Parameters
+    ----------
+    door_ID : str
+        ID of the door to be opened.
+    start : int
+        First index to check.
+    stop : int
+        Index at which to stop checking (exclusive).
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash must start with.
+        The default is 5.
+    batch_size : int, optional
+        Maximum number of indices hashed at once.
+        The default is 65536.
+
+    Returns
+    -------
+    hits : list(tuple(int, str))
+        List of (index, hash) pairs for every matching index, in ascending index order.
+
+    """
+    import numpy as np
+
+    prefix = door_ID.encode('utf-8')
+
+    # The zeroes are checked on the first word of the digest, where each pair of zeroes is a
+    # whole byte and an odd zero is the high half of a byte, starting from the lowest byte
+    mask = 0
+    for k in range(min(prefix_zeros, 8)):
+        mask |= 0xF << 4*(k ^ 1)
+    mask = np.uint32(mask)
+
+    hits = []
+    batch_start = start
+    while batch_start < stop:
+        # Every index in a batch must have the same number of digits
+        batch_stop = min(stop, batch_start + batch_size, 10**len(str(batch_start)))
+        indices = np.arange(batch_start, batch_stop, dtype=np.int64)
+        # Screen the batch, then confirm any candidates with hashlib, which also checks any
+        # zeroes beyond the first word
+        for i in map(int, indices[(md5_first_words(prefix, indices) & mask) == 0]):
+            hits.extend((j, digest.hex())
+                        for j, digest in iter_interesting_hashes(door_ID, i, prefix_zeros, i + 1))
+        batch_start = batch_stop
+
+    return hits
+
+# Functions searching a block of indices for each available hashing backend
+SEARCH_BLOCK_BACKENDS = {'hashlib': search_block,
+                         'numpy': search_block_numpy}
+
+def benchmark_backends(door_ID: str='uqwqemis', start: int=0, stop: int=1000000,
+                       prefix_zeros: int=5) -> dict:
+    """
+    Times each hashing backend searching the same range of indices, and checks they all find
+    exactly the same hits.
+
+    Parameters
+    ----------
+    door_ID : str, optional
+        ID of the door to be opened.
+        The default is 'uqwqemis'.
+    start : int, optional
+        First index to check.
+        The default is 0.
+    stop : int, optional
+        Index at which to stop checking (exclusive).
+        The default is 1000000.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash must start with.
+        The default is 5.
+
+    Returns
+    -------
+    timings : dict(str: float)
+        Time taken in seconds by each backend.
+
+    """
+    timings, all_hits = {}, {}
+    for backend, search in SEARCH_BLOCK_BACKENDS.items():
+        t0 = time.perf_counter()
+        all_hits[backend] = search(door_ID, start, stop, prefix_zeros)
+        timings[backend] = time.perf_counter() - t0
+        print(f'{backend}: {timings[backend]:.3f} s, {stop - start} hashes, '
+              f'{len(all_hits[backend])} hits')
+
+    # Every backend must agree exactly with hashlib
+    for backend, hits in all_hits.items():
+        if hits != all_hits['hashlib']:
+            raise ValueError(f'Backend {backend} disagrees with hashlib')
+
+    return timings
+
+def iter_hit_blocks(door_ID: str, start: int=0, processes: int=1, block_size: int=10000,
+                    prefix_zeros: int=5, backend: str='hashlib'):
+    """
+    Lazily searches consecutive blocks of indices for hashes starting with zeroes, starting
+    from a given index. If more than one process is requested, blocks are handed out to a pool of
+    worker processes, but are still yielded strictly in index order. Closing the generator cancels
+    any blocks which have not yet started.
+
+    Parameters
+    ----------
+    door_ID : str
+        ID of the door to be opened.
+    start : int, optional
+        First index to check.
+        The default is 0.
+    processes : int, optional
+        Number of worker processes to search with.
+        The default is 1.
+    block_size : int, optional
+        Number of indices in each block.
+        The default is 10000.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash must start with.
+        The default is 5.
+    backend : str, optional
+        Hashing backend used to search each block, one of 'hashlib' or 'numpy'.
+        The default is 'hashlib'.
+
+    Yields
+    ------
+    block_stop : int
+        Index at which the current block ends (exclusive).
+    hits : list(tuple(int, str))
+        List of (index, hash) pairs found in the current block, in ascending index order.
+
+    """
+    # Starting indices of every block to be searched
+    block_starts = count(start, block_size)
+    search = SEARCH_BLOCK_BACKENDS[backend]
+
+    # If searching on a single core, simply search each block in turn
+    if processes == 1:
+        for block_start in block_starts:
+            hits = search(door_ID, block_start, block_start + block_size, prefix_zeros)
+            if profiling.enabled:
+                profiling.count('Day5.blocks')
+                profiling.count('Day5.hashes', block_size)
+            yield block_start + block_size, hits
+        return
+
+    with ProcessPoolExecutor(processes) as executor:
+        # Queue of submitted blocks in index order, keeping a couple of blocks per worker in flight
+        # so that no worker sits idle while results are being consumed
+        pending = deque((block_start + block_size,
+                         executor.submit(search, door_ID, block_start,
+                                         block_start + block_size, prefix_zeros))
+                        for block_start in islice(block_starts, 2*processes))
+        try:
+            while True:
+                # Wait for the earliest block, so that hits are always merged in index order
+                block_stop, future = pending.popleft()
+                hits = future.result()
+                # Count the work of the workers as their blocks are merged
+                if profiling.enabled:
+                    profiling.count('Day5.blocks')
+                    profiling.count('Day5.hashes', block_size)
+                yield block_stop, hits
+                # Replace it with the next block
+                block_start = next(block_starts)
+                pending.append((block_start + block_size,
+                                executor.submit(search, door_ID, block_start,
+                                                block_start + block_size, prefix_zeros)))
+        finally:
+            # Once the consumer is done, drop every block which has not been started yet
+            executor.shutdown(wait=False, cancel_futures=True)
+
+def add_character_Part1(password: list, id_hash: str, prefix_zeros: int=5) -> bool:
+    """
+    Adds the character following the leading zeroes of a hash (the sixth character for five
+    zeroes) to the next undetermined position in a password.
+
+    Parameters
+    ----------
+    password : list(str)
+        Characters of the password, with undetermined characters given as '_'. Modified in place.
+    id_hash : str
+        Hexadecimal representation of the hash.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash starts with.
+        The default is 5.
+
+    Returns
+    -------
+    added : bool
+        Whether or not a character was added to the password.
+
+    """
+    # If the password is already complete there is nothing to add
+    if '_' not in password:
+        return False
+    # Set the first undetermined character to the character following the zeroes
+    password[password.index('_')] = id_hash[prefix_zeros]
+
+    return True
+
+def add_character_Part2(password: list, id_hash: str, prefix_zeros: int=5) -> bool:
+    """
+    Uses a hash starting with zeroes to add a character to a password, where the first character
+    after the zeroes (the sixth character for five zeroes) gives the position of the new character
+    and the next character gives the character itself. Only the first result for each position is
+    used, and invalid positions are ignored.
+
+    Parameters
+    ----------
+    password : list(str)
+        Characters of the password, with undetermined characters given as '_'. Modified in place.
+    id_hash : str
+        Hexadecimal representation of the hash.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash starts with.
+        The default is 5.
+
+    Returns
+    -------
+    added : bool
+        Whether or not a character was added to the password.
+
+    """
+    # Check the corresponding password index is valid and has not already been found
+    if (index := int(id_hash[prefix_zeros], 16)) < len(password) and password[index] == '_':
+        # Set corresponding position in password to the following character
+        password[index] = id_hash[prefix_zeros + 1]
+        return True
+
+    return False
+
+def expected_hits_remaining(passwords: list, add_characters: list) -> float:
+    """
+    Estimates the number of further hashes starting with zeroes needed to complete every password.
+
+    Parameters
+    ----------
+    passwords : list(list(str))
+        Characters of each password, with undetermined characters given as '_'.
+    add_characters : list(function)
+        Function adding characters to each corresponding password.
+
+    Returns
+    -------
+    expected_hits : float
+        Expected number of further hits needed.
+
+    """
+    expected_hits = 0
+    for password, add_character in zip(passwords, add_characters):
+        missing = password.count('_')
+        # Each hit fills one of the missing positions at random out of 16 possible positions, so
+        # on average 16/k hits are needed while k positions are missing
+        if add_character is add_character_Part2:
+            expected_hits = max(expected_hits, 16*sum(1/k for k in range(1, missing + 1)))
+        # Otherwise every hit fills the next position
+        else:
+            expected_hits = max(expected_hits, missing)
+
+    return expected_hits
+
+class ProgressReporter:
+    """
+    Class displaying the progress of a password search from a background thread, by sampling the
+    current index and the passwords on a timer, so that the search itself only needs to update the
+    index. Shows the passwords (with random characters for undetermined characters for effect),
+    the current index, the hash rate and an estimate of the time remaining.
+    """
+    def __init__(self, passwords: list, add_characters: list, start: int, prefix_zeros: int=5,
+                 interval: float=0.1, silent: bool=False):
+        """
+        Parameters
+        ----------
+        passwords : list(list(str))
+            Characters of each password, with undetermined characters given as '_'. Updated in
+            place by the search.
+        add_characters : list(function)
+            Function adding characters to each corresponding password.
+        start : int
+            Index the search starts from.
+        prefix_zeros : int, optional
+            Number of zeroes the hexadecimal representation of a hash must start with.
+            The default is 5.
+        interval : float, optional
+            Time in seconds between updates of the display.
+            The default is 0.1.
+        silent : bool, optional
+            Whether or not to display nothing at all, for batch runs.
+            The default is False.
+
+        """
+        self.passwords, self.add_characters = passwords, add_characters
+        self.start_index = self.index = start
+        self.prefix_zeros, self.interval, self.silent = prefix_zeros, interval, silent
+        self._stop, self._width = threading.Event(), 0
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self):
+        self.start_time = time.perf_counter()
+        if not self.silent:
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if not self.silent:
+            self._stop.set()
+            self._thread.join()
+            # Clear the progress line
+            print('\r' + ' '*self._width + '\r', end='', flush=True)
+
+    def _run(self) -> None:
+        # Update the display on every tick until stopped
+        while not self._stop.wait(self.interval):
+            self.display()
+
+    def display(self) -> None:
+        """
+        Displays the current progress over the current line.
+
+        Returns
+        -------
+        None.
+
+        """
+        # Sample the shared state once
+        index, elapsed = self.index, time.perf_counter() - self.start_time
+        rate = (index - self.start_index)/elapsed if elapsed > 0 else 0
+
+        # Each hash starts with the zeroes with a probability of 16^-zeroes
+        remaining = expected_hits_remaining(self.passwords, self.add_characters) \
+            * 16**self.prefix_zeros
+        eta = time.strftime('%H:%M:%S', time.gmtime(remaining/rate)) if rate else '--:--:--'
+
+        passwords = ' '.join(''.join(random.choice('0123456789abcdef') if c == '_' else c
+                                     for c in password) for password in self.passwords)
+        line = f'{passwords} | index {index:,} | {rate/1000:,.1f} kH/s | ETA {eta}'
+        print('\r' + line.ljust(self._width), end='', flush=True)
+        self._width = len(line)
+
+def read_json(json_file: str):
+    """
+    Reads a JSON file, treating a missing or unreadable file as absent, so that a corrupt cache or
+    checkpoint only loses the progress saved in it rather than breaking every later search.
+
+    Parameters
+    ----------
+    json_file : str
+        JSON file to read.
+
+    Returns
+    -------
+    data : dict or None
+        Contents of the file, or None if it is missing, unreadable or not a JSON object.
+
+    """
+    try:
+        with open(json_file) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    return data if isinstance(data, dict) else None
+
+def write_json(json_file: str, data: dict) -> None:
+    """
+    Writes a JSON file atomically, by writing to a temporary file unique to the writing process and
+    thread first, so that neither an interrupted write nor another writer can leave it truncated.
+
+    Parameters
+    ----------
+    json_file : str
+        JSON file to write.
+    data : dict
+        Contents to write.
+
+    Returns
+    -------
+    None.
+
+    """
+    os.makedirs(os.path.dirname(json_file) or '.', exist_ok=True)
+    with open(temp_file := f'{json_file}.{os.getpid()}.{threading.get_ident()}.tmp', 'w') as f:
+        json.dump(data, f)
+    os.replace(temp_file, json_file)
+
+@contextmanager
+def file_lock(path: str):
+    """
+    Context manager holding an exclusive lock on a file across processes, using a separate lock
+    file next to it, so that concurrent read-modify-write cycles of the file don't lose updates.
+
+    Parameters
+    ----------
+    path : str
+        File to lock.
+
+    Yields
+    ------
+    None.
+
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path + '.lock', 'a') as lock:
+        # The lock is released when the lock file is closed
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        yield
+
+def load_hits(cache_file: str, door_ID: str, prefix_zeros: int=5) -> tuple:
+    """
+    Loads the hashes starting with a given number of zeroes previously found for a door of a given
+    ID from a cache file, along with the index up to which the hashes have been checked.
+
+    Parameters
+    ----------
+    cache_file : str
+        JSON file containing the cached hits for every door ID searched so far.
+    door_ID : str
+        ID of the door to be opened.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hashes start with.
+        The default is 5.
+
+    Returns
+    -------
+    scanned : int
+        Index up to which every hash has been checked (exclusive).
+    hits : list(tuple(int, str))
+        List of (index, hash) pairs found so far, in ascending index order.
+
+    """
+    # If nothing has been cached yet, or the cache can't be read, nothing has been scanned
+    cache = (read_json(cache_file) or {}).get(door_ID, {}) \
+        .get(str(prefix_zeros), {'scanned': 0, 'hits': []})
+
+    return cache['scanned'], [tuple(hit) for hit in cache['hits']]
+
+def save_hits(cache_file: str, door_ID: str, scanned: int, hits: list,
+              prefix_zeros: int=5) -> None:
+    """
+    Saves the hashes starting with a given number of zeroes found for a door of a given ID to a
+    cache file, along with the index up to which the hashes have been checked. Entries for other
+    door IDs or numbers of zeroes, or entries which have been scanned further by another run, are
+    left untouched.
+
+    Parameters
+    ----------
+    cache_file : str
+        JSON file containing the cached hits for every door ID searched so far.
+    door_ID : str
+        ID of the door to be opened.
+    scanned : int
+        Index up to which every hash has been checked (exclusive).
+    hits : list(tuple(int, str))
+        List of (index, hash) pairs found so far, in ascending index order.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hashes start with.
+        The default is 5.
+
+    Returns
+    -------
+    None.
+
+    """
+    # Hold the lock while merging, so that concurrent searches don't lose each other's entries
+    with file_lock(cache_file):
+        cache = read_json(cache_file) or {}
+        # Don't overwrite the progress of a run which got further
+        door_cache = cache.setdefault(door_ID, {})
+        if door_cache.get(str(prefix_zeros), {'scanned': 0})['scanned'] >= scanned:
+            return
+        door_cache[str(prefix_zeros)] = {'scanned': scanned, 'hits': hits}
+
+        write_json(cache_file, cache)
+
+def add_hit(passwords: list, add_characters: list, id_hash: str, prefix_zeros: int=5) -> bool:
+    """
+    Passes a hash starting with zeroes to the character adding function of each incomplete
+    password, and checks if every password is now complete.
+
+    Parameters
+    ----------
+    passwords : list(list(str))
+        Characters of each password, with undetermined characters given as '_'. Modified in place.
+    add_characters : list(function)
+        Function adding characters to each corresponding password.
+    id_hash : str
+        Hexadecimal representation of the hash.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of the hash starts with.
+        The default is 5.
+
+    Returns
+    -------
+    complete : bool
+        Whether or not every password is complete.
+
+    """
+    complete = True
+    for password, add_character in zip(passwords, add_characters):
+        if '_' in password:
+            add_character(password, id_hash, prefix_zeros)
+            complete &= '_' not in password
+
+    return complete
+
+def load_checkpoint(checkpoint_file: str, door_ID: str, add_characters: list,
+                    prefix_zeros: int=5) -> tuple:
+    """
+    Loads the state of an interrupted password search from a checkpoint file, if the checkpoint
+    was made by a search for the same door ID, passwords and number of zeroes.
+
+    Parameters
+    ----------
+    checkpoint_file : str
+        JSON file containing the checkpoint.
+    door_ID : str
+        ID of the door to be opened.
+    add_characters : list(function)
+        Function adding characters to each password being searched for.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of a hash must start with.
+        The default is 5.
+
+    Returns
+    -------
+    checkpoint : tuple(int, list(list(str)), list(tuple(int, str))) or None
+        Index up to which every hash has been checked (exclusive), characters of each password so
+        far and list of (index, hash) pairs found so far, or None if there is no matching
+        checkpoint.
+
+    """
+    # A missing or unreadable checkpoint means starting afresh
+    if (checkpoint := read_json(checkpoint_file)) is None:
+        return None
+
+    # Only resume a search for exactly the same passwords
+    if (checkpoint.get('door_ID'), checkpoint.get('prefix_zeros'),
+        checkpoint.get('add_characters')) \
+        != (door_ID, prefix_zeros, [add_character.__name__ for add_character in add_characters]):
+        return None
+
+    return (checkpoint['index'], [list(password) for password in checkpoint['passwords']],
+            [tuple(hit) for hit in checkpoint['hits']])
+
+def save_checkpoint(checkpoint_file: str, door_ID: str, add_characters: list, prefix_zeros: int,
+                    index: int, passwords: list, hits: list) -> None:
+    """
+    Saves the state of a password search to a checkpoint file, so that it can be resumed later.
+
+    Parameters
+    ----------
+    checkpoint_file : str
+        JSON file to save the checkpoint to.
+    door_ID : str
+        ID of the door to be opened.
+    add_characters : list(function)
+        Function adding characters to each password being searched for.
+    prefix_zeros : int
+        Number of zeroes the hexadecimal representation of a hash must start with.
+    index : int
+        Index up to which every hash has been checked (exclusive).
+    passwords : list(list(str))
+        Characters of each password so far, with undetermined characters given as '_'.
+    hits : list(tuple(int, str))
+        List of (index, hash) pairs found so far, in ascending index order.
+
+    Returns
+    -------
+    None.
+
+    """
+    checkpoint = {'door_ID': door_ID,
+                  'prefix_zeros': prefix_zeros,
+                  'add_characters': [add_character.__name__ for add_character in add_characters],
+                  'index': index,
+                  'passwords': [''.join(password) for password in passwords],
+                  'hits': hits}
+
+    write_json(checkpoint_file, checkpoint)
+
+def find_passwords(door_ID: str, add_characters: list, processes: int=1,
+                   cache_file: str='Cache/Day5_Hits.json', prefix_zeros: int=5,
+                   backend: str='hashlib', checkpoint_file: str=None,
+                   checkpoint_interval: float=60, verbose: bool=True) -> list:
+    """
+    Finds one or more eight-character passwords for a door of a given ID in a single search, by
+    passing every hash of the door ID and an increasing integer index (starting with 0) which
+    starts with a given number of zeroes to a given function for each password which adds
+    characters to it, until every password is complete.
+
+    Parameters
+    ----------
+    door_ID : str
+        ID of the door to be opened.
+    add_characters : list(function)
+        Functions taking the password characters and a hash, which add a character to the
+        corresponding password in place.
+    processes : int, optional
+        Number of worker processes to search with.
+        The default is 1.
+    cache_file : str or None, optional
+        JSON file in which the hits found for each door ID are cached between runs, so that only
+        indices beyond those already checked need to be hashed. If None, no cache is used.
+        The default is 'Cache/Day5_Hits.json'.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of a hash must start with.
+        The default is 5.
+    backend : str, optional
+        Hashing backend used to search for hashes, one of 'hashlib' or 'numpy'.
+        The default is 'hashlib'.
+    checkpoint_file : str or None, optional
+        JSON file to which the state of the search is periodically saved, and from which an
+        interrupted search for the same passwords is resumed. The file is removed once the
+        passwords are complete. If None, no checkpoints are made.
+        The default is None.
+    checkpoint_interval : float, optional
+        Minimum time in seconds between checkpoints.
+        The default is 60.
+    verbose : bool, optional
+        Whether or not to display the progress of the search and the final passwords.
+        The default is True.
+
+    Returns
+    -------
+    passwords : list(str)
+        Passwords of the door with the given ID, in the same order as add_characters.
+
+    """
+    # Resume from a checkpoint of an interrupted search, if there is one
+    if checkpoint_file and (checkpoint := load_checkpoint(checkpoint_file, door_ID, add_characters,
+                                                          prefix_zeros)):
+        (scanned, passwords, hits), cached_scanned, complete = checkpoint, 0, False
+
+    else:
+        # Starting with empty passwords (all _'s)
+        passwords = [['_']*8 for add_character in add_characters]
+
+        # Load any hits already found for this door ID
+        scanned, hits = load_hits(cache_file, door_ID, prefix_zeros) if cache_file else (0, [])
+        cached_scanned = scanned
+
+        # Pass each cached hit to the passwords in index order, until they are all complete
+        for i, id_hash in hits:
+            if complete := add_hit(passwords, add_characters, id_hash, prefix_zeros):
+                break
+        else:
+            complete = False
+
+    try:
+        # Search blocks of indices beyond those already checked until the passwords are complete
+        if not complete:
+            last_checkpoint = time.perf_counter()
+            hit_blocks = iter_hit_blocks(door_ID, scanned, processes, prefix_zeros=prefix_zeros,
+                                         backend=backend)
+            with ProgressReporter(passwords, add_characters, scanned, prefix_zeros,
+                                  silent=not verbose) as reporter:
+                for block_stop, block_hits in hit_blocks:
+                    # Pass each hit to the passwords in index order, stopping as soon as they are
+                    # complete so that later hits in the block are ignored
+                    for i, id_hash in block_hits:
+                        hits.append((i, id_hash))
+                        if complete := add_hit(passwords, add_characters, id_hash, prefix_zeros):
+                            scanned = i + 1
+                            break
+                    else:
+                        scanned = block_stop
+                    # Share the progress with the reporter
+                    reporter.index = scanned
+                    if complete:
+                        break
+                    # Periodically save the state of the search
+                    if checkpoint_file \
+                        and time.perf_counter() - last_checkpoint > checkpoint_interval:
+                        save_checkpoint(checkpoint_file, door_ID, add_characters, prefix_zeros,
+                                        scanned, passwords, hits)
+                        last_checkpoint = time.perf_counter()
+            # Stop any remaining searches
+            hit_blocks.close()
+
+    finally:
+        # Record all progress made in the cache, even if the search was interrupted
+        if cache_file and scanned > cached_scanned:
+            save_hits(cache_file, door_ID, scanned, hits, prefix_zeros)
+        # Save the state of an interrupted search, or remove the checkpoint of a finished one
+        if checkpoint_file and not complete:
+            save_checkpoint(checkpoint_file, door_ID, add_characters, prefix_zeros, scanned,
+                            passwords, hits)
+        elif checkpoint_file and os.path.exists(checkpoint_file):
+            os.remove(checkpoint_file)
+
+    # Join characters of final passwords
+    passwords = [''.join(password) for password in passwords]
+    if verbose:
+        print('\r' + ' '.join(passwords), flush=True)
+
+    return passwords
+
+@profiling.timed
+def Day5_Part1(door_ID: str='uqwqemis', processes: int=1,
+               cache_file: str='Cache/Day5_Hits.json', prefix_zeros: int=5,
+               backend: str='hashlib', checkpoint_file: str=None,
+               checkpoint_interval: float=60, verbose: bool=True) -> str:
     """
     Finds the password for a door of a given ID. The eight-character password for the door is
     generated one character at a time by finding the MD5 hash of the Door ID and an increasing
@@ -14,6 +902,29 @@ def Day5_Part1(door_ID: str='uqwqemis') -> str:
     door_ID : str, optional
         ID of the door to be opened.
         The default is 'uqwqemis'.
+    processes : int, optional
+        Number of worker processes to search with.
+        The default is 1.
+    cache_file : str or None, optional
+        JSON file in which the hits found for each door ID are cached between runs. If None, no
+        cache is used.
+        The default is 'Cache/Day5_Hits.json'.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of a hash must start with.
+        The default is 5.
+    backend : str, optional
+        Hashing backend used to search for hashes, one of 'hashlib' or 'numpy'.
+        The default is 'hashlib'.
+    checkpoint_file : str or None, optional
+        JSON file to which the state of the search is periodically saved, and from which an
+        interrupted search is resumed. If None, no checkpoints are made.
+        The default is None.
+    checkpoint_interval : float, optional
+        Minimum time in seconds between checkpoints.
+        The default is 60.
+    verbose : bool, optional
+        Whether or not to display the progress of the search and the final password.
+        The default is True.
 
     Returns
     -------
@@ -21,45 +932,15 @@ def Day5_Part1(door_ID: str='uqwqemis') -> str:
         Password of the door with the given ID.
 
     """
-    # Starting with index of 0, empty password (all _'s) and password index of 0
-    i, password, index = 0, ['_']*8, 0
-
-    # While the password is less than 8 characters
-    while index < 8:
-        # Find MD5 hash of door ID + current index with hashlib library, check if it starts with
-        # five zeros
-        if (id_hash := md5((door_ID + str(i)).encode('utf-8')).hexdigest()).startswith('00000'):
-            # Add sixth character to password
-            password[index] = id_hash[5]
-            # Increment password index
-            index += 1
-            # Display password with random characters for undetermined characters
-            display_password = ''
-            for c in password:
-                if c == '_':
-                    display_password += hex(np.random.randint(0, 16))[2]
-                else:
-                    display_password += c
-            print('\r' + display_password, end='', flush=True)
-            
-        # Display password with random characters for undetermined characters for effect
-        elif i % 10000 == 0:
-            display_password = ''
-            for c in password:
-                if c == '_':
-                    display_password += hex(np.random.randint(0, 16))[2]
-                else:
-                    display_password += c
-            print('\r' + display_password, end='', flush=True)
-        # Increment index
-        i += 1
-
-    # Join characters of final password
-    print('\r' + (password := ''.join(password)), flush=True)
-    
-    return password
-
-def Day5_Part2(door_ID: str='uqwqemis') -> str:
+    return find_passwords(door_ID, [add_character_Part1], processes, cache_file,
+                          prefix_zeros, backend, checkpoint_file, checkpoint_interval,
+                          verbose)[0]
+
+@profiling.timed
+def Day5_Part2(door_ID: str='uqwqemis', processes: int=1,
+               cache_file: str='Cache/Day5_Hits.json', prefix_zeros: int=5,
+               backend: str='hashlib', checkpoint_file: str=None,
+               checkpoint_interval: float=60, verbose: bool=True) -> str:
     """
     Finds the password for a door of a given ID. The eight-character password for the door is
     generated one character at a time by finding the MD5 hash of the Door ID and an increasing
@@ -74,6 +955,29 @@ def Day5_Part2(door_ID: str='uqwqemis') -> str:
     door_ID : str, optional
         ID of the door to be opened.
         The default is 'uqwqemis'.
+    processes : int, optional
+        Number of worker processes to search with.
+        The default is 1.
+    cache_file : str or None, optional
+        JSON file in which the hits found for each door ID are cached between runs. If None, no
+        cache is used.
+        The default is 'Cache/Day5_Hits.json'.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of a hash must start with.
+        The default is 5.
+    backend : str, optional
+        Hashing backend used to search for hashes, one of 'hashlib' or 'numpy'.
+        The default is 'hashlib'.
+    checkpoint_file : str or None, optional
+        JSON file to which the state of the search is periodically saved, and from which an
+        interrupted search is resumed. If None, no checkpoints are made.
+        The default is None.
+    checkpoint_interval : float, optional
+        Minimum time in seconds between checkpoints.
+        The default is 60.
+    verbose : bool, optional
+        Whether or not to display the progress of the search and the final password.
+        The default is True.
 
     Returns
     -------
@@ -81,38 +985,53 @@ def Day5_Part2(door_ID: str='uqwqemis') -> str:
         Password of the door with the given ID.
 
     """
-    # Starting with index of 0 and empty password (all _'s)
-    i, password = 0, ['_']*8
-
-    # While some characters are undetermined
-    while '_' in password:
-        # Find MD5 hash of door ID + current index with hashlib library, check if it starts with
-        # five zeros and the corresponding password index is valid and has not already been found
-        if (id_hash := md5((door_ID + str(i)).encode('utf-8')).hexdigest()).startswith('00000') \
-            and (index := int(id_hash[5], 16)) < 8 and password[index] == '_':
-            # Set corresponding position in password to seventh character
-            password[index] = id_hash[6]
-            # Display password with random characters for undetermined characters
-            display_password = ''
-            for c in password:
-                if c == '_':
-                    display_password += hex(np.random.randint(0, 16))[2]
-                else:
-                    display_password += c
-            print('\r' + display_password, end='', flush=True)
-        # Display password with random characters for undetermined characters for effect
-        elif i % 10000 == 0:
-            display_password = ''
-            for c in password:
-                if c == '_':
-                    display_password += hex(np.random.randint(0, 16))[2]
-                else:
-                    display_password += c
-            print('\r' + display_password, end='', flush=True)
-            # Increment index
-        i += 1
-
-    # Join characters of final password
-    print('\r' + (password := ''.join(password)), flush=True)
-    
-    return password
+    return find_passwords(door_ID, [add_character_Part2], processes, cache_file,
+                          prefix_zeros, backend, checkpoint_file, checkpoint_interval,
+                          verbose)[0]
+
+def Day5_Both_Parts(door_ID: str='uqwqemis', processes: int=1,
+                    cache_file: str='Cache/Day5_Hits.json', prefix_zeros: int=5,
+                    backend: str='hashlib', checkpoint_file: str=None,
+                    checkpoint_interval: float=60, verbose: bool=True) -> tuple:
+    """
+    Finds the passwords for a door of a given ID from both Day5_Part1 and Day5_Part2 with a single
+    search, passing every hash starting with five zeroes to both passwords until both are complete.
+
+    Parameters
+    ----------
+    door_ID : str, optional
+        ID of the door to be opened.
+        The default is 'uqwqemis'.
+    processes : int, optional
+        Number of worker processes to search with.
+        The default is 1.
+    cache_file : str or None, optional
+        JSON file in which the hits found for each door ID are cached between runs. If None, no
+        cache is used.
+        The default is 'Cache/Day5_Hits.json'.
+    prefix_zeros : int, optional
+        Number of zeroes the hexadecimal representation of a hash must start with.
+        The default is 5.
+    backend : str, optional
+        Hashing backend used to search for hashes, one of 'hashlib' or 'numpy'.
+        The default is 'hashlib'.
+    checkpoint_file : str or None, optional
+        JSON file to which the state of the search is periodically saved, and from which an
+        interrupted search is resumed. If None, no checkpoints are made.
+        The default is None.
+    checkpoint_interval : float, optional
+        Minimum time in seconds between checkpoints.
+        The default is 60.
+    verbose : bool, optional
+        Whether or not to display the progress of the search and the final password.
+        The default is True.
+
+    Returns
+    -------
+    passwords : tuple(str)
+        Passwords of the door with the given ID from Day5_Part1 and Day5_Part2 respectively.
+
+    """
+    return tuple(find_passwords(door_ID, [add_character_Part1, add_character_Part2], processes,
+                                cache_file, prefix_zeros, backend, checkpoint_file,
+                                checkpoint_interval, verbose))
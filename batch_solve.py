@@ -0,0 +1,290 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+import argparse
+import glob
+import importlib
+import json
+import os
+import re
+import signal
+import sys
+import time
+
+# Pattern finding the day an input file is for from its path
+DAY_PATTERN = re.compile(r'Day(\d+)')
+
+class JobTimeoutError(Exception):
+    """
+    Raised in a job when it runs for longer than its timeout. This deliberately doesn't derive from
+    TimeoutError, which is an OSError, so that code ignoring OSError such as the input cache can't
+    swallow it.
+    """
+
+def _raise_timeout(signum, frame):
+    raise JobTimeoutError('job timed out')
+
+def solve_job(input_file: str, day: int, part: int, timeout: float=None,
+              day5_cache: str='Cache/Day5_Hits.json') -> dict:
+    """
+    Runs a single solver on a single input file, catching any error so that one failing job can't
+    affect the others. Day 5 input files contain the door ID, and are solved quietly, sharing a hit
+    cache which concurrent jobs update under a file lock. If a timeout
+    is given, the job is interrupted by an alarm signal once it has run for that long, so this must
+    run in the main thread of its process, as it does in a worker of a process pool.
+
+    Parameters
+    ----------
+    input_file : str
+        Input file to solve.
+    day : int
+        Day of the solver.
+    part : int
+        Part of the solver.
+    timeout : float or None, optional
+        Maximum time in seconds the job may run for. If None, there is no limit.
+        The default is None.
+    day5_cache : str or None, optional
+        JSON file caching the hits of Day 5 searches (see Day5.find_passwords). If None, no cache
+        is used.
+        The default is 'Cache/Day5_Hits.json'.
+
+    Returns
+    -------
+    result : dict
+        The file, day and part, the status ('ok', 'error' or 'timeout'), the answer or error, and
+        the time taken in seconds.
+
+    """
+    result = {'file': input_file, 'day': day, 'part': part}
+    t0 = time.perf_counter()
+    if timeout:
+        signal.signal(signal.SIGALRM, _raise_timeout)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        try:
+            solver = getattr(importlib.import_module(f'Day{day}'), f'Day{day}_Part{part}')
+            if day == 5:
+                with open(input_file) as f:
+                    answer = solver(f.read().strip(), cache_file=day5_cache, verbose=False)
+            else:
+                answer = solver(input_file)
+        finally:
+            # Cancel the alarm before recording the answer, so it can't go off after the job has
+            # succeeded or in a later job
+            if timeout:
+                signal.setitimer(signal.ITIMER_REAL, 0)
+        result.update(status='ok', answer=answer)
+    except JobTimeoutError:
+        result.update(status='timeout', error=f'timed out after {timeout} s')
+    except Exception as error:
+        result.update(status='error', error=f'{type(error).__name__}: {error}')
+    result['seconds'] = time.perf_counter() - t0
+
+    return result
+
+def solve_job_isolated(input_file: str, day: int, part: int, timeout: float=None,
+                       day5_cache: str='Cache/Day5_Hits.json') -> dict:
+    """
+    Runs a single job as solve_job does, but in a worker process of its own, so that if the worker
+    dies outright, such as when killed for running out of memory, only this job fails.
+
+    Parameters
+    ----------
+    input_file : str
+        Input file to solve.
+    day : int
+        Day of the solver.
+    part : int
+        Part of the solver.
+    timeout : float or None, optional
+        Maximum time in seconds the job may run for. If None, there is no limit.
+        The default is None.
+    day5_cache : str or None, optional
+        JSON file caching the hits of Day 5 searches (see Day5.find_passwords). If None, no cache
+        is used.
+        The default is 'Cache/Day5_Hits.json'.
+
+    Returns
+    -------
+    result : dict
+        The file, day and part, the status ('ok', 'error' or 'timeout'), the answer or error, and
+        the time taken in seconds if the job finished.
+
+    """
+    with ProcessPoolExecutor(1) as executor:
+        try:
+            return executor.submit(solve_job, input_file, day, part, timeout, day5_cache).result()
+        except Exception as error:
+            return {'file': input_file, 'day': day, 'part': part, 'status': 'error',
+                    'error': f'{type(error).__name__}: {error}'}
+
+def find_jobs(paths: list, days: list=range(1, 6), parts: list=(1, 2)) -> list:
+    """
+    Finds every (file, day, part) job to run from a list of files, directories and glob patterns.
+    The day of each file is taken from the last 'DayN' in its path, and files for days which
+    weren't asked for are ignored. If only one day is asked for, files without a day in their path
+    are taken to be for that day. Jobs are ordered from the largest file to the smallest, so the
+    longest jobs start first and don't hold up the end of the batch.
+
+    Parameters
+    ----------
+    paths : list(str)
+        Input files, directories searched recursively for files, or glob patterns.
+    days : list(int), optional
+        Days to solve.
+        The default is range(1, 6).
+    parts : list(int), optional
+        Parts to solve for each day.
+        The default is (1, 2).
+
+    Returns
+    -------
+    jobs : list(tuple(str, int, int))
+        (file, day, part) of each job, from the largest file to the smallest.
+
+    """
+    files = set()
+    for path in paths:
+        if os.path.isdir(path):
+            files.update(file for file in glob.glob(os.path.join(path, '**', '*'), recursive=True)
+                         if os.path.isfile(file))
+        else:
+            files.update(file for file in glob.glob(path, recursive=True) if os.path.isfile(file))
+
+    jobs = []
+    for file in files:
+        # Skip the sidecar files written by generate_inputs
+        if file.endswith('.answers.json'):
+            continue
+        if matches := DAY_PATTERN.findall(file):
+            day = int(matches[-1])
+        elif len(days) == 1:
+            day = days[0]
+        else:
+            continue
+        if day in days:
+            jobs += [(file, day, part) for part in parts]
+
+    # Largest files first, keeping the order of the jobs for a file
+    jobs.sort(key=lambda job: (-os.path.getsize(job[0]), job[0], job[1], job[2]))
+
+    return jobs
+
+def batch_solve(jobs: list, processes: int=None, timeout: float=None, output=sys.stdout,
+                day5_cache: str='Cache/Day5_Hits.json') -> dict:
+    """
+    Runs jobs in a pool of worker processes, writing the result of each as a line of JSON as soon
+    as it finishes. A worker which dies outright, such as when killed for running out of memory,
+    breaks the whole pool and with it every job not yet finished, without saying which job killed
+    it. Those jobs are then run again each in a worker process of its own, so that only the job
+    which kills its worker fails.
+
+    Parameters
+    ----------
+    jobs : list(tuple(str, int, int))
+        (file, day, part) of each job.
+    processes : int or None, optional
+        Number of worker processes to use. If None, one per CPU is used.
+        The default is None.
+    timeout : float or None, optional
+        Maximum time in seconds each job may run for. If None, there is no limit.
+        The default is None.
+    output : file, optional
+        File to write the results to.
+        The default is sys.stdout.
+    day5_cache : str or None, optional
+        JSON file caching the hits of Day 5 searches, shared by every job. If None, no cache is
+        used.
+        The default is 'Cache/Day5_Hits.json'.
+
+    Returns
+    -------
+    summary : dict
+        Number of jobs with each status, the total time in seconds and the number of jobs
+        finished per second.
+
+    """
+    summary, t0 = {'ok': 0, 'error': 0, 'timeout': 0}, time.perf_counter()
+
+    def record(result):
+        summary[result['status']] += 1
+        output.write(json.dumps(result) + '\n')
+        output.flush()
+
+    unfinished = []
+    with ProcessPoolExecutor(processes) as executor:
+        futures = {executor.submit(solve_job, *job, timeout, day5_cache): i
+                   for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            try:
+                result = future.result()
+            except BrokenProcessPool:
+                # Keep every job failed by a broken pool to run again
+                unfinished.append(futures[future])
+                continue
+            except Exception as error:
+                file, day, part = jobs[futures[future]]
+                result = {'file': file, 'day': day, 'part': part, 'status': 'error',
+                          'error': f'{type(error).__name__}: {error}'}
+            record(result)
+
+    # Run the jobs left by a broken pool in their original order, each in a worker of its own,
+    # still running as many at once as the pool did
+    if unfinished:
+        with ThreadPoolExecutor(processes or os.cpu_count()) as executor:
+            futures = [executor.submit(solve_job_isolated, *jobs[i], timeout, day5_cache)
+                       for i in sorted(unfinished)]
+            for future in as_completed(futures):
+                record(future.result())
+
+    summary['seconds'] = time.perf_counter() - t0
+    summary['jobs_per_second'] = len(jobs)/summary['seconds'] if summary['seconds'] else 0.0
+
+    return summary
+
+def main(argv: list=None) -> int:
+    """
+    Command line interface, solving a batch of input files.
+
+    Parameters
+    ----------
+    argv : list(str) or None, optional
+        Command line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    exit_code : int
+        1 if any job failed or timed out, else 0.
+
+    """
+    parser = argparse.ArgumentParser(description='Solve many input files in parallel, writing '
+                                                 'one JSON line per result.')
+    parser.add_argument('paths', nargs='+', help='input files, directories or glob patterns')
+    parser.add_argument('--days', type=int, nargs='+', default=list(range(1, 6)),
+                        help='days to solve')
+    parser.add_argument('--parts', type=int, nargs='+', default=[1, 2], help='parts to solve')
+    parser.add_argument('--processes', type=int, help='worker processes, by default one per CPU')
+    parser.add_argument('--timeout', type=float, help='maximum seconds per job')
+    parser.add_argument('--output', help='file to write the results to, by default stdout')
+    parser.add_argument('--day5-cache', default='Cache/Day5_Hits.json',
+                        help="hit cache shared by Day 5 jobs, or 'none' for no cache")
+    args = parser.parse_args(argv)
+
+    jobs = find_jobs(args.paths, args.days, args.parts)
+    day5_cache = None if args.day5_cache.lower() == 'none' else args.day5_cache
+    if args.output:
+        with open(args.output, 'w') as output:
+            summary = batch_solve(jobs, args.processes, args.timeout, output, day5_cache)
+    else:
+        summary = batch_solve(jobs, args.processes, args.timeout, day5_cache=day5_cache)
+
+    # Keep the summary off stdout so the results stay valid JSON lines
+    print(f"{len(jobs)} jobs: {summary['ok']} ok, {summary['error']} failed, "
+          f"{summary['timeout']} timed out in {summary['seconds']:.2f} s "
+          f"({summary['jobs_per_second']:.1f} jobs/s)", file=sys.stderr)
+
+    return 1 if summary['error'] or summary['timeout'] else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,331 @@
+from statistics import median
+import argparse
+import importlib
+import json
+import os
+import re
+import time
+import tracemalloc
+
+import input_cache
+import profiling
+
+# Pattern matching the name of a solver function
+SOLVER_PATTERN = re.compile(r'Day(\d+)_Part(\d+)$')
+# Pattern matching the name of an input loader, such as get_input or load_instruction_arrays
+LOADER_PATTERN = re.compile(r'get_input\w*|load_\w+')
+
+def discover_solvers(days: list=range(1, 6)) -> dict:
+    """
+    Finds every solver function, named DayN_PartM, in the module of each given day.
+
+    Parameters
+    ----------
+    days : list(int), optional
+        Days whose modules should be searched.
+        The default is range(1, 6).
+
+    Returns
+    -------
+    solvers : dict(str: function)
+        Solver functions keyed by name, in order of day and part.
+
+    """
+    solvers = {}
+    for day in days:
+        module = importlib.import_module(f'Day{day}')
+        # Take every function whose whole name matches, so helpers such as Day5_Both_Parts or
+        # benchmark_Day1_Part1 are ignored
+        solvers.update((name, function) for name, function in vars(module).items()
+                       if SOLVER_PATTERN.match(name) and callable(function))
+
+    return solvers
+
+def time_call_phases(function, args: tuple, phases: list, warmup: int=1,
+                     repeats: int=5) -> tuple:
+    """
+    Times repeated calls of a function, after a number of untimed warmup calls, along with the time
+    spent in given profiling phases during each call. Profiling is turned on for the timed calls,
+    and restored to its previous state afterwards.
+
+    Parameters
+    ----------
+    function : function
+        Function to time.
+    args : tuple
+        Arguments to call the function with.
+    phases : list(str)
+        Names of the phases to time within each call.
+    warmup : int, optional
+        Number of untimed calls made first.
+        The default is 1.
+    repeats : int, optional
+        Number of timed calls.
+        The default is 5.
+
+    Returns
+    -------
+    times : list(float)
+        Time taken in seconds by each timed call.
+    phase_times : list(float)
+        Total time in seconds spent in the phases during each timed call.
+
+    """
+    def phase_seconds():
+        recorded = profiling.results()['phases']
+        return sum(recorded[name]['seconds'] for name in phases if name in recorded)
+
+    for _ in range(warmup):
+        function(*args)
+
+    times, phase_times = [], []
+    profiling_enabled, profiling.enabled = profiling.enabled, True
+    try:
+        for _ in range(repeats):
+            # Take the difference of the phase totals, so that earlier results are kept
+            before, t0 = phase_seconds(), time.perf_counter()
+            function(*args)
+            times.append(time.perf_counter() - t0)
+            phase_times.append(phase_seconds() - before)
+    finally:
+        profiling.enabled = profiling_enabled
+
+    return times, phase_times
+
+def peak_memory(function, args: tuple) -> int:
+    """
+    Measures the peak memory allocated by Python during a single call of a function. This is
+    measured in a separate call from the timed calls, since tracing allocations slows them down.
+
+    Parameters
+    ----------
+    function : function
+        Function to measure.
+    args : tuple
+        Arguments to call the function with.
+
+    Returns
+    -------
+    peak : int
+        Peak number of bytes allocated during the call.
+
+    """
+    tracemalloc.start()
+    try:
+        function(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    return peak
+
+def benchmark_solver(name: str, solver, input_dir: str='Inputs', door_ID: str=None,
+                     warmup: int=1, repeats: int=5) -> dict:
+    """
+    Benchmarks a single solver on its input, timing the whole solve along with the time spent
+    within it in the module's input loaders, as recorded by their profiling phases, so that the
+    parse time is that of the loader and options the solver actually uses. The peak memory of a
+    solve is also measured. Day 5 takes a door ID rather than an input file, so has no parse time,
+    and is run without its hit cache or progress display so each repeat does the full search.
+
+    Parameters
+    ----------
+    name : str
+        Name of the solver, as DayN_PartM.
+    solver : function
+        Solver function.
+    input_dir : str, optional
+        Directory containing the input file of each day, named DayN_Inputs.txt.
+        The default is 'Inputs'.
+    door_ID : str or None, optional
+        Door ID for Day 5. If None, the solver's default is used.
+        The default is None.
+    warmup : int, optional
+        Number of untimed calls made first.
+        The default is 1.
+    repeats : int, optional
+        Number of timed calls.
+        The default is 5.
+
+    Returns
+    -------
+    result : dict
+        Median and minimum times in seconds for parsing, solving and in total, the peak memory in
+        bytes, and the answer, or a status of 'skipped' with the reason if the input is missing.
+
+    """
+    day = int(SOLVER_PATTERN.match(name)[1])
+    module = importlib.import_module(f'Day{day}')
+
+    if day == 5:
+        # Search from scratch each time, quietly
+        args = () if door_ID is None else (door_ID,)
+        def run(*solver_args):
+            return solver(*solver_args, cache_file=None, verbose=False)
+    else:
+        if not os.path.exists(input_file := os.path.join(input_dir, f'Day{day}_Inputs.txt')):
+            return {'status': 'skipped', 'reason': f'{input_file} not found'}
+        args, run = (input_file,), solver
+
+    result = {'status': 'ok', 'answer': run(*args)}
+
+    # Time the parsing of the input within each solve, by whichever loaders the solver calls
+    loaders = [f'{module.__name__}.{name}' for name in vars(module)
+               if LOADER_PATTERN.fullmatch(name)]
+    total_times, parse_times = time_call_phases(run, args, loaders, warmup, repeats)
+    # The solve time of each call is what remains of its total once the input is parsed
+    solve_times = [total - parse for total, parse in zip(total_times, parse_times)]
+
+    result.update({'parse_median': median(parse_times), 'parse_min': min(parse_times),
+                   'solve_median': median(solve_times), 'solve_min': min(solve_times),
+                   'total_median': median(total_times), 'total_min': min(total_times),
+                   'peak_memory': peak_memory(run, args)})
+
+    return result
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float=0.1,
+                        metrics: tuple=('total_median', 'peak_memory')) -> list:
+    """
+    Compares benchmark results to a baseline, flagging every metric which has grown by more than a
+    given fraction.
+
+    Parameters
+    ----------
+    results : dict(str: dict)
+        Benchmark results for each solver.
+    baseline : dict(str: dict)
+        Baseline results for each solver, in the same format.
+    threshold : float, optional
+        Fractional increase above which a metric counts as a regression.
+        The default is 0.1.
+    metrics : tuple(str), optional
+        Metrics to compare.
+        The default is ('total_median', 'peak_memory').
+
+    Returns
+    -------
+    regressions : list(tuple)
+        (solver, metric, baseline value, new value) of each regression.
+
+    """
+    regressions = []
+    for name, result in results.items():
+        # Only compare solvers which ran both times
+        if result.get('status') != 'ok' or baseline.get(name, {}).get('status') != 'ok':
+            continue
+        for metric in metrics:
+            old, new = baseline[name][metric], result[metric]
+            if old > 0 and new > old*(1 + threshold):
+                regressions.append((name, metric, old, new))
+
+    return regressions
+
+def run_benchmarks(days: list=range(1, 6), input_dir: str='Inputs', door_ID: str=None,
+                   warmup: int=1, repeats: int=5, pattern: str=None,
+                   use_input_cache: bool=False) -> dict:
+    """
+    Benchmarks every solver of the given days, printing a line per solver as it finishes. The
+    parsed input cache is turned off by default, so that every repeat parses its input afresh.
+
+    Parameters
+    ----------
+    days : list(int), optional
+        Days whose solvers should be benchmarked.
+        The default is range(1, 6).
+    input_dir : str, optional
+        Directory containing the input file of each day, named DayN_Inputs.txt.
+        The default is 'Inputs'.
+    door_ID : str or None, optional
+        Door ID for Day 5. If None, the solver's default is used.
+        The default is None.
+    warmup : int, optional
+        Number of untimed calls made first.
+        The default is 1.
+    repeats : int, optional
+        Number of timed calls.
+        The default is 5.
+    pattern : str or None, optional
+        Regular expression which solver names must contain to be run. If None, all are run.
+        The default is None.
+    use_input_cache : bool, optional
+        Whether or not the solvers may reuse parsed inputs from the input cache.
+        The default is False.
+
+    Returns
+    -------
+    results : dict(str: dict)
+        Benchmark results for each solver (see benchmark_solver).
+
+    """
+    results = {}
+    cache_enabled, input_cache.enabled = input_cache.enabled, use_input_cache
+    try:
+        for name, solver in discover_solvers(days).items():
+            if pattern is not None and not re.search(pattern, name):
+                continue
+            results[name] = result = benchmark_solver(name, solver, input_dir, door_ID, warmup,
+                                                      repeats)
+            if result['status'] == 'ok':
+                print(f"{name}: parse {result['parse_median']:.4f} s, "
+                      f"solve {result['solve_median']:.4f} s, "
+                      f"total {result['total_median']:.4f} s, "
+                      f"peak {result['peak_memory']/2**20:.1f} MiB")
+            else:
+                print(f"{name}: skipped ({result['reason']})")
+    finally:
+        input_cache.enabled = cache_enabled
+
+    return results
+
+def main(argv: list=None) -> int:
+    """
+    Command line interface, benchmarking the solvers, writing the results to a JSON file and
+    comparing them to a baseline.
+
+    Parameters
+    ----------
+    argv : list(str) or None, optional
+        Command line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    exit_code : int
+        1 if any regression was found, else 0.
+
+    """
+    parser = argparse.ArgumentParser(description='Benchmark every DayN_PartM solver.')
+    parser.add_argument('--days', type=int, nargs='+', default=list(range(1, 6)),
+                        help='days to benchmark')
+    parser.add_argument('--filter', help='only run solvers whose names match this regex')
+    parser.add_argument('--input-dir', default='Inputs',
+                        help='directory containing DayN_Inputs.txt files')
+    parser.add_argument('--door-id', help='door ID for Day 5')
+    parser.add_argument('--warmup', type=int, default=1, help='untimed calls per solver')
+    parser.add_argument('--repeats', type=int, default=5, help='timed calls per solver')
+    parser.add_argument('--output', default='benchmark_results.json',
+                        help='JSON file to write the results to')
+    parser.add_argument('--baseline', help='JSON file of earlier results to compare against')
+    parser.add_argument('--input-cache', action='store_true',
+                        help='let the solvers reuse parsed inputs from the input cache')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='fractional slowdown or memory growth counted as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.days, args.input_dir, args.door_id, args.warmup,
+                             args.repeats, args.filter, args.input_cache)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare_to_baseline(results, json.load(f), args.threshold)
+    for name, metric, old, new in regressions:
+        print(f'REGRESSION {name} {metric}: {old:.6g} -> {new:.6g} ({new/old - 1:+.1%})')
+
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,366 @@
+import argparse
+import json
+import os
+import random
+import string
+
+# Number of items buffered before each write, so files of any size are written in bounded memory
+WRITE_BATCH = 10000
+
+# Rows of the keypads of each part of Day 2, where spaces are not keys. The expected codes are
+# found by walking these directly rather than with the solver's Keypad, so they can catch its bugs
+KEYPAD_ROWS = (('123',
+                '456',
+                '789'),
+               ('  1  ',
+                ' 234 ',
+                '56789',
+                ' ABC ',
+                '  D  '))
+# Change in (row, column) of each Day 2 direction
+KEYPAD_MOVES = {'U': (-1, 0), 'D': (1, 0), 'L': (0, -1), 'R': (0, 1)}
+
+def generate_Day1(output_file: str, num_instructions: int=10000, seed: int=0,
+                  max_distance: int=100) -> dict:
+    """
+    Writes a file of movement instructions with a planted first revisit. The path starts as a
+    staircase of alternating right and left turns, which only ever moves east or north and so never
+    crosses itself, and ends on a move north of at least two spaces. Three turns right of one space
+    then lead back onto the space just before the end of the staircase, which is therefore the
+    first location visited twice, and the remaining instructions are random.
+
+    Parameters
+    ----------
+    output_file : str
+        File to write the instructions to.
+    num_instructions : int, optional
+        Number of instructions to write, at least 5.
+        The default is 10000.
+    seed : int, optional
+        Seed of the random number generator.
+        The default is 0.
+    max_distance : int, optional
+        Largest distance of a random instruction.
+        The default is 100.
+
+    Returns
+    -------
+    answers : dict(str: int)
+        Expected answer of each part.
+
+    """
+    if num_instructions < 5:
+        raise ValueError('At least 5 instructions are needed to plant a revisit')
+    rng = random.Random(seed)
+
+    # Use about half the instructions for the staircase, as an even number of (R, L) pairs
+    staircase_pairs = max(1, (num_instructions - 3)//4)
+    num_random = num_instructions - 3 - 2*staircase_pairs
+
+    def instructions():
+        # Staircase, where the final move north is at least two spaces
+        for pair in range(staircase_pairs):
+            yield 'R', rng.randint(1, max_distance)
+            yield 'L', rng.randint(2 if pair == staircase_pairs - 1 else 1, max_distance)
+        # Hook back onto the staircase
+        for _ in range(3):
+            yield 'R', 1
+        for _ in range(num_random):
+            yield rng.choice('LR'), rng.randint(1, max_distance)
+
+    # Headings in clockwise order, starting facing north
+    headings = ((0, 1), (1, 0), (0, -1), (-1, 0))
+    heading, x, y, revisit = 0, 0, 0, None
+    with open(output_file, 'w') as f:
+        batch = []
+        for i, (turn, distance) in enumerate(instructions()):
+            heading = (heading + (1 if turn == 'R' else -1))%4
+            x += headings[heading][0]*distance
+            y += headings[heading][1]*distance
+            # The end of the hook is the first revisit
+            if i == 2*staircase_pairs + 2:
+                revisit = abs(x) + abs(y)
+            batch.append(f'{turn}{distance}')
+            if len(batch) == WRITE_BATCH:
+                f.write(', '.join(batch) + (', ' if i < num_instructions - 1 else ''))
+                batch = []
+        f.write(', '.join(batch) + '\n')
+
+    answers = {'Day1_Part1': abs(x) + abs(y), 'Day1_Part2': revisit}
+
+    return answers
+
+def generate_Day2(output_file: str, num_lines: int=1000, line_length: int=500,
+                  seed: int=0) -> dict:
+    """
+    Writes a file of random lines of keypad instructions, following each line on both keypads as it
+    is written to find the expected codes.
+
+    Parameters
+    ----------
+    output_file : str
+        File to write the instructions to.
+    num_lines : int, optional
+        Number of lines to write.
+        The default is 1000.
+    line_length : int, optional
+        Number of instructions on each line.
+        The default is 500.
+    seed : int, optional
+        Seed of the random number generator.
+        The default is 0.
+
+    Returns
+    -------
+    answers : dict(str: str)
+        Expected answer of each part.
+
+    """
+    rng = random.Random(seed)
+
+    # Start at the 5 of each keypad
+    positions = [next((row, rows[row].index('5')) for row in range(len(rows)) if '5' in rows[row])
+                 for rows in KEYPAD_ROWS]
+    codes = [[], []]
+    with open(output_file, 'w') as f:
+        for _ in range(num_lines):
+            line = ''.join(rng.choices('UDLR', k=line_length))
+            f.write(line + '\n')
+            # Walk the line on each keypad from where the previous line ended, one step at a time,
+            # ignoring steps off the keypad
+            for i, rows in enumerate(KEYPAD_ROWS):
+                row, col = positions[i]
+                for step in line:
+                    next_row, next_col = row + KEYPAD_MOVES[step][0], col + KEYPAD_MOVES[step][1]
+                    if 0 <= next_row < len(rows) and 0 <= next_col < len(rows[next_row]) \
+                        and rows[next_row][next_col] != ' ':
+                        row, col = next_row, next_col
+                positions[i] = (row, col)
+                codes[i].append(rows[row][col])
+
+    answers = {'Day2_Part1': ''.join(codes[0]), 'Day2_Part2': ''.join(codes[1])}
+
+    return answers
+
+def generate_Day3(output_file: str, num_rows: int=100000, seed: int=0,
+                  max_side: int=999) -> dict:
+    """
+    Writes a file of rows of three random side lengths, counting the valid triangles both by row
+    and by column as it is written.
+
+    Parameters
+    ----------
+    output_file : str
+        File to write the side lengths to.
+    num_rows : int, optional
+        Number of rows to write.
+        The default is 100000.
+    seed : int, optional
+        Seed of the random number generator.
+        The default is 0.
+    max_side : int, optional
+        Largest side length.
+        The default is 999.
+
+    Returns
+    -------
+    answers : dict(str: int)
+        Expected answer of each part.
+
+    """
+    rng = random.Random(seed)
+
+    def is_valid(sides):
+        sides = sorted(sides)
+        return sides[0] + sides[1] > sides[2]
+
+    num_valid, num_valid_vertical, block = 0, 0, []
+    with open(output_file, 'w') as f:
+        batch = []
+        for _ in range(num_rows):
+            row = [rng.randint(1, max_side) for _ in range(3)]
+            batch.append(f'{row[0]:5d}{row[1]:5d}{row[2]:5d}')
+            num_valid += is_valid(row)
+            # Each complete block of three rows holds a triangle in each column
+            block.append(row)
+            if len(block) == 3:
+                num_valid_vertical += sum(is_valid(column) for column in zip(*block))
+                block = []
+            if len(batch) == WRITE_BATCH:
+                f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+
+    answers = {'Day3_Part1': num_valid, 'Day3_Part2': num_valid_vertical}
+
+    return answers
+
+def generate_Day4(output_file: str, num_rooms: int=10000, seed: int=0,
+                  real_fraction: float=0.5) -> dict:
+    """
+    Writes a file of random rooms, a given fraction of which are real and the rest decoys with an
+    incorrect checksum, with a real room named 'northpole object storage' planted at a random
+    position.
+
+    Parameters
+    ----------
+    output_file : str
+        File to write the rooms to.
+    num_rooms : int, optional
+        Number of rooms to write, including the planted room.
+        The default is 10000.
+    seed : int, optional
+        Seed of the random number generator.
+        The default is 0.
+    real_fraction : float, optional
+        Fraction of the random rooms which are real.
+        The default is 0.5.
+
+    Returns
+    -------
+    answers : dict(str: int)
+        Expected answer of each part.
+
+    """
+    rng = random.Random(seed)
+    target = 'northpole object storage'
+    planted_position = rng.randrange(num_rooms)
+
+    # Checksums and encryption are worked out here rather than with the solver's functions, so the
+    # expected answers can catch their bugs
+    def checksum(name):
+        # The five most common letters, with ties broken alphabetically
+        return ''.join(sorted(set(name) - {'-'}, key=lambda letter: (-name.count(letter), letter))
+                       [:5])
+
+    def encrypt(name, sector_ID):
+        # Rotate each letter back through the alphabet by the sector ID, and spaces become dashes
+        return ''.join('-' if char == ' ' else chr((ord(char) - 97 - sector_ID)%26 + 97)
+                       for char in name)
+
+    def random_room():
+        while True:
+            name = '-'.join(''.join(rng.choices(string.ascii_lowercase, k=rng.randint(3, 10)))
+                            for _ in range(rng.randint(2, 5)))
+            sector_ID = rng.randint(100, 999)
+            # Make sure only the planted room decrypts to the target, and that the name has enough
+            # distinct letters for a checksum
+            if name != encrypt(target, sector_ID) and len(set(name) - {'-'}) >= 5:
+                break
+        if rng.random() < real_fraction:
+            return name, sector_ID, checksum(name), True
+        # Decoys have any other checksum
+        while (decoy_checksum := ''.join(rng.choices(string.ascii_lowercase, k=5))) \
+            == checksum(name):
+            pass
+        return name, sector_ID, decoy_checksum, False
+
+    real_ID_sum = 0
+    with open(output_file, 'w') as f:
+        batch = []
+        for position in range(num_rooms):
+            if position == planted_position:
+                # Encrypt the target name with the rotation of a random sector ID
+                sector_ID = rng.randint(100, 999)
+                name = encrypt(target, sector_ID)
+                room_ID, room_checksum, real = sector_ID, checksum(name), True
+            else:
+                name, room_ID, room_checksum, real = random_room()
+            # Rooms are known to be real from how they were built, rather than by checking them
+            if real:
+                real_ID_sum += room_ID
+            batch.append(f'{name}-{room_ID}[{room_checksum}]')
+            if len(batch) == WRITE_BATCH:
+                f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+
+    answers = {'Day4_Part1': real_ID_sum, 'Day4_Part2': sector_ID}
+
+    return answers
+
+# Generator and name of the size parameter for each day. Day 5 takes a door ID rather than an
+# input file, so has no generator
+GENERATORS = {1: (generate_Day1, 'num_instructions'),
+              2: (generate_Day2, 'num_lines'),
+              3: (generate_Day3, 'num_rows'),
+              4: (generate_Day4, 'num_rooms')}
+
+def generate_input(day: int, output_file: str, size: int, seed: int=0, **kwargs) -> dict:
+    """
+    Writes a generated input file for a day, along with a sidecar JSON file of the expected answers
+    named after the input file with '.answers.json' appended.
+
+    Parameters
+    ----------
+    day : int
+        Day to generate an input file for.
+    output_file : str
+        File to write the input to.
+    size : int
+        Number of instructions, lines, rows or rooms to write, depending on the day.
+    seed : int, optional
+        Seed of the random number generator.
+        The default is 0.
+    **kwargs
+        Further parameters of the day's generator.
+
+    Returns
+    -------
+    answers : dict
+        Expected answer of each part.
+
+    """
+    if day not in GENERATORS:
+        raise ValueError(f'No generator for day {day}')
+    generator, size_name = GENERATORS[day]
+
+    if os.path.dirname(output_file):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    answers = generator(output_file, seed=seed, **{size_name: size}, **kwargs)
+
+    with open(output_file + '.answers.json', 'w') as f:
+        json.dump(answers, f, indent=2)
+
+    return answers
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, generating an input file for a day.
+
+    Parameters
+    ----------
+    argv : list(str) or None, optional
+        Command line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+    parser = argparse.ArgumentParser(description='Generate an input file with known answers.')
+    parser.add_argument('day', type=int, choices=sorted(GENERATORS), help='day to generate for')
+    parser.add_argument('size', type=int,
+                        help='number of instructions (day 1), lines (day 2), rows (day 3) or '
+                             'rooms (day 4)')
+    parser.add_argument('--output', help='file to write, by default Inputs/DayN_Generated.txt')
+    parser.add_argument('--seed', type=int, default=0, help='random seed')
+    parser.add_argument('--line-length', type=int, help='instructions per line (day 2)')
+    parser.add_argument('--real-fraction', type=float, help='fraction of real rooms (day 4)')
+    args = parser.parse_args(argv)
+
+    kwargs = {}
+    if args.line_length is not None:
+        kwargs['line_length'] = args.line_length
+    if args.real_fraction is not None:
+        kwargs['real_fraction'] = args.real_fraction
+
+    output_file = args.output or f'Inputs/Day{args.day}_Generated.txt'
+    answers = generate_input(args.day, output_file, args.size, args.seed, **kwargs)
+    print(f'Wrote {output_file}: {answers}' if args.day != 2 else f'Wrote {output_file}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,215 @@
+from collections import OrderedDict
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+
+# Whether loaders use the cache at all, which can be turned off by setting the environment variable
+# AOC_INPUT_CACHE to 0
+enabled = os.environ.get('AOC_INPUT_CACHE', '1') != '0'
+
+# Maximum number of parsed inputs kept in memory, and the maximum total size in bytes of their
+# pickles, which is taken as an estimate of the memory they use
+MEMORY_CACHE_SIZE = 16
+MEMORY_CACHE_LIMIT = 1 << 30
+# Directory of the on-disk cache, and the maximum total size in bytes of the files in it
+DISK_CACHE_DIR = 'Cache/Inputs'
+DISK_CACHE_LIMIT = 1 << 30
+
+# Parsed inputs kept in memory with their estimated sizes, in order of least to most recently used,
+# and their total estimated size
+_memory_cache = OrderedDict()
+_memory_bytes = 0
+_stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+def cached_input(loader):
+    """
+    Decorator caching the parsed result of a loader function, whose first parameter is the path of
+    an input file. Results are keyed on the loader, the absolute path, modification time and size
+    of the file, and the values of the remaining parameters, so editing the file or asking for
+    different parse options gives a fresh parse. Results are kept in a bounded in-process cache
+    and pickled to an on-disk cache, both of which discard the least recently used results when
+    full, the in-process cache being limited both in number of results and in the total size of
+    their pickles. Since cached results are shared between calls, callers must not modify them.
+
+    Parameters
+    ----------
+    loader : function
+        Function parsing an input file, taking the path of the file as its first parameter.
+
+    Returns
+    -------
+    cached_loader : function
+        Loader using the cache. The original loader is available as its __wrapped__ attribute.
+
+    """
+    signature = inspect.signature(loader)
+    # A change to the loader's code invalidates its cached results
+    code_hash = _code_hash(loader)
+
+    @functools.wraps(loader)
+    def cached_loader(*args, **kwargs):
+        global _memory_bytes
+        if not enabled:
+            return loader(*args, **kwargs)
+
+        # Fill in the default values so that equivalent calls share the same key
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        input_file, *options = bound.arguments.values()
+        try:
+            stat = os.stat(input_file)
+        except OSError:
+            # Let the loader raise its usual error for a missing file
+            return loader(*args, **kwargs)
+        key = (loader.__module__, loader.__qualname__, code_hash, os.path.abspath(input_file),
+               stat.st_mtime_ns, stat.st_size, repr(options))
+
+        # Use the result in memory if there is one, marking it as most recently used
+        if key in _memory_cache:
+            _memory_cache.move_to_end(key)
+            _stats['memory_hits'] += 1
+            return _memory_cache[key][0]
+
+        # Else load the result from disk if there is one, or parse the file and save the result,
+        # taking the size of its pickle either way
+        disk_file = os.path.join(DISK_CACHE_DIR,
+                                 hashlib.sha1(repr(key).encode()).hexdigest() + '.pickle')
+        if (loaded := _load_from_disk(disk_file)) is not None:
+            _stats['disk_hits'] += 1
+            result, size = loaded
+        else:
+            _stats['misses'] += 1
+            result = loader(*args, **kwargs)
+            size = _save_to_disk(disk_file, result)
+
+        # Keep the result in memory, discarding the least recently used results until the cache
+        # fits, which discards the result straight away if it is too large to keep on its own
+        _memory_cache[key] = (result, size)
+        _memory_bytes += size
+        while len(_memory_cache) > MEMORY_CACHE_SIZE or _memory_bytes > MEMORY_CACHE_LIMIT:
+            _memory_bytes -= _memory_cache.popitem(last=False)[1][1]
+
+        return result
+
+    return cached_loader
+
+def _code_hash(loader) -> str:
+    # Hash the source of the loader's whole module, so that changing a constant in the loader or a
+    # module level helper it relies on (such as a precompiled pattern) also changes the hash.
+    # Bytecode alone leaves out constants. Fall back on the loader's bytecode and constants if its
+    # source isn't available
+    try:
+        with open(inspect.getsourcefile(loader), 'rb') as f:
+            source = f.read()
+    except (OSError, TypeError):
+        source = loader.__code__.co_code + repr(loader.__code__.co_consts).encode()
+
+    return hashlib.sha1(source).hexdigest()[:12]
+
+class _ByteCounter:
+    # File-like object counting the bytes written to it, to find the size of a pickle without
+    # keeping it
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data) -> int:
+        self.size += len(data)
+        return len(data)
+
+def _load_from_disk(disk_file: str):
+    try:
+        with open(disk_file, 'rb') as f:
+            result = pickle.load(f), os.fstat(f.fileno()).st_size
+    except (OSError, pickle.PickleError, EOFError):
+        return None
+    # Mark the file as most recently used for eviction, which may fail on a read-only cache
+    try:
+        os.utime(disk_file)
+    except OSError:
+        pass
+
+    return result
+
+def _save_to_disk(disk_file: str, result) -> int:
+    # Write to a temporary file first so that an interrupted write, or another process writing the
+    # same result, can't leave a corrupt file. The cache is only an optimisation, so if the result
+    # can't be written, e.g. to a read-only or full disk, or can't be pickled, skip saving it. The
+    # size of the pickle is returned, or 0 if the result can't be pickled
+    temp_file = f'{disk_file}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(DISK_CACHE_DIR, exist_ok=True)
+        with open(temp_file, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            size = f.tell()
+        os.replace(temp_file, disk_file)
+    except (OSError, pickle.PicklingError, TypeError, AttributeError):
+        try:
+            os.remove(temp_file)
+        except OSError:
+            pass
+        # Still find the size of the pickle if only writing it failed
+        try:
+            pickle.dump(result, counter := _ByteCounter(), protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return 0
+        return counter.size
+
+    # Remove the least recently used files until the cache fits within its size limit
+    files = []
+    try:
+        for entry in os.scandir(DISK_CACHE_DIR):
+            if entry.name.endswith('.pickle'):
+                files.append((entry.stat().st_mtime_ns, entry.stat().st_size, entry.path))
+    except OSError:
+        # Another process may have removed a file while scanning, so leave eviction to later
+        return size
+    total_size = sum(file_size for _, file_size, _ in files)
+    for _, file_size, path in sorted(files):
+        if total_size <= DISK_CACHE_LIMIT:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total_size -= file_size
+
+    return size
+
+def cache_info() -> dict:
+    """
+    Gives the statistics of the input cache.
+
+    Returns
+    -------
+    cache_info : dict(str: int)
+        Number of results found in memory and on disk, number of files parsed, and the number and
+        estimated total size in bytes of the results currently kept in memory.
+
+    """
+    return {**_stats, 'memory_size': len(_memory_cache), 'memory_bytes': _memory_bytes}
+
+def clear_cache(disk: bool=False) -> None:
+    """
+    Empties the in-process cache and resets its statistics, and optionally the on-disk cache.
+
+    Parameters
+    ----------
+    disk : bool, optional
+        Whether or not to also remove every file from the on-disk cache.
+        The default is False.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _memory_bytes
+    _memory_cache.clear()
+    _memory_bytes = 0
+    _stats.update(dict.fromkeys(_stats, 0))
+    if disk and os.path.isdir(DISK_CACHE_DIR):
+        for entry in os.scandir(DISK_CACHE_DIR):
+            if entry.name.endswith('.pickle'):
+                os.remove(entry.path)
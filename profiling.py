@@ -0,0 +1,205 @@
+from collections import defaultdict
+import cProfile
+import functools
+import json
+import os
+import time
+
+# Whether instrumentation is recorded, which can be turned on by setting the environment variable
+# AOC_PROFILE to 1 or by calling enable. Hot loops check this before counting, so that counting
+# costs a single attribute lookup when profiling is off
+enabled = os.environ.get('AOC_PROFILE', '0') == '1'
+
+# Number of calls and total time in seconds of each phase, and the total of each counter
+_timings = defaultdict(lambda: [0, 0.0])
+_counters = defaultdict(int)
+# cProfile profiler running alongside the phase timings, if requested
+_profiler = None
+
+def enable(cprofile: bool=False) -> None:
+    """
+    Turns on recording of phase timings and counters, and optionally a cProfile profile of every
+    function call.
+
+    Parameters
+    ----------
+    cprofile : bool, optional
+        Whether or not to also run cProfile, which slows everything down considerably.
+        The default is False.
+
+    Returns
+    -------
+    None.
+
+    """
+    global enabled, _profiler
+    enabled = True
+    if cprofile and _profiler is None:
+        _profiler = cProfile.Profile()
+        _profiler.enable()
+
+def disable() -> None:
+    """
+    Turns off recording of phase timings and counters, and stops cProfile if it is running. Results
+    recorded so far are kept until reset.
+
+    Returns
+    -------
+    None.
+
+    """
+    global enabled
+    enabled = False
+    if _profiler is not None:
+        _profiler.disable()
+
+def reset() -> None:
+    """
+    Discards every recorded phase timing, counter and cProfile profile.
+
+    Returns
+    -------
+    None.
+
+    """
+    global _profiler
+    _timings.clear()
+    _counters.clear()
+    if _profiler is not None:
+        _profiler.disable()
+        _profiler = None
+
+def count(name: str, n: int=1) -> None:
+    """
+    Adds to a named counter of units of work. Counts should be added in bulk, e.g. once per line
+    rather than once per character, to keep the cost down when profiling is on.
+
+    Parameters
+    ----------
+    name : str
+        Name of the counter.
+    n : int, optional
+        Number of units of work to add.
+        The default is 1.
+
+    Returns
+    -------
+    None.
+
+    """
+    if enabled:
+        _counters[name] += n
+
+class phase:
+    """
+    Context manager timing a named phase of work, such as parsing or solving. Phases may be nested,
+    in which case the time of the inner phase is also included in the outer phase.
+    """
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        """
+        Parameters
+        ----------
+        name : str
+            Name of the phase.
+
+        """
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        # Only record phases which were started while profiling was on
+        if self.start is not None:
+            timing = _timings[self.name]
+            timing[0] += 1
+            timing[1] += time.perf_counter() - self.start
+            self.start = None
+
+def timed(function=None, *, name: str=None):
+    """
+    Decorator timing every call of a function as a phase, named after the module and function
+    unless a name is given. When profiling is off, the function is called directly.
+
+    Parameters
+    ----------
+    function : function
+        Function to time.
+    name : str or None, optional
+        Name of the phase. If None, the module and function name are used, e.g. 'Day1.get_input'.
+        The default is None.
+
+    Returns
+    -------
+    timed_function : function
+        Function recording its time when profiling is on.
+
+    """
+    # Allow use both as @timed and as @timed(name=...)
+    if function is None:
+        return functools.partial(timed, name=name)
+    name = name or f'{function.__module__}.{function.__qualname__}'
+
+    @functools.wraps(function)
+    def timed_function(*args, **kwargs):
+        if not enabled:
+            return function(*args, **kwargs)
+        with phase(name):
+            return function(*args, **kwargs)
+
+    return timed_function
+
+def results() -> dict:
+    """
+    Gives every recorded phase timing and counter.
+
+    Returns
+    -------
+    results : dict
+        Number of calls and total seconds of each phase under 'phases', and the total of each
+        counter under 'counters'.
+
+    """
+    return {'phases': {name: {'calls': calls, 'seconds': seconds}
+                       for name, (calls, seconds) in _timings.items()},
+            'counters': dict(_counters)}
+
+def export_json(output_file: str) -> None:
+    """
+    Writes every recorded phase timing and counter to a JSON file.
+
+    Parameters
+    ----------
+    output_file : str
+        JSON file to write to.
+
+    Returns
+    -------
+    None.
+
+    """
+    with open(output_file, 'w') as f:
+        json.dump(results(), f, indent=2)
+
+def export_stats(output_file: str) -> None:
+    """
+    Writes the cProfile profile to a file, which can be read with pstats or tools such as snakeviz.
+
+    Parameters
+    ----------
+    output_file : str
+        File to write the profile to.
+
+    Returns
+    -------
+    None.
+
+    """
+    if _profiler is None:
+        raise RuntimeError('cProfile was not enabled, call enable(cprofile=True) first')
+    _profiler.dump_stats(output_file)
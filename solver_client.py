@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import socket
+
+from solver_service import DEFAULT_SOCKET
+
+def send_requests(requests: list, socket_path: str=DEFAULT_SOCKET) -> list:
+    """
+    Sends requests to a running solver service over a single connection, and waits for every
+    response.
+
+    Parameters
+    ----------
+    requests : list(dict)
+        Requests to send (see SolverService). Each is given its position in the list as its id.
+    socket_path : str, optional
+        Path of the service's Unix socket.
+        The default is DEFAULT_SOCKET.
+
+    Returns
+    -------
+    responses : list(dict)
+        Response to each request, in the same order as the requests.
+
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as client:
+        client.connect(socket_path)
+        client.sendall(b''.join(json.dumps({**request, 'id': i}).encode() + b'\n'
+                                for i, request in enumerate(requests)))
+        # Tell the service every request has been sent, so it closes the connection once done
+        client.shutdown(socket.SHUT_WR)
+        with client.makefile('rb') as f:
+            responses = [json.loads(line) for line in f]
+
+    # Responses arrive as they are ready, so put them back in request order
+    responses.sort(key=lambda response: response['id'])
+
+    return responses
+
+def solve(day: int, part: int, input_file: str=None, door_ID: str=None,
+          socket_path: str=DEFAULT_SOCKET, **options) -> dict:
+    """
+    Solves a single puzzle with a running solver service.
+
+    Parameters
+    ----------
+    day : int
+        Day of the solver.
+    part : int
+        Part of the solver.
+    input_file : str or None, optional
+        Input file to solve, for days 1 to 4. The path is opened by the service, so should be
+        absolute if the service runs from a different directory.
+        The default is None.
+    door_ID : str or None, optional
+        Door ID to solve, for day 5.
+        The default is None.
+    socket_path : str, optional
+        Path of the service's Unix socket.
+        The default is DEFAULT_SOCKET.
+    **options
+        Further keyword arguments for the solver.
+
+    Returns
+    -------
+    response : dict
+        The service's response, with the answer under 'answer' if the status is 'ok'.
+
+    """
+    request = {'day': day, 'part': part, 'options': options}
+    if day == 5:
+        request['door_id'] = door_ID
+    else:
+        request['input_file'] = input_file
+
+    return send_requests([request], socket_path)[0]
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, solving a puzzle with a running solver service and printing the
+    response as JSON.
+
+    Parameters
+    ----------
+    argv : list(str) or None, optional
+        Command line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+    parser = argparse.ArgumentParser(description='Send a solve request to the solver service.')
+    parser.add_argument('day', type=int, help='day to solve')
+    parser.add_argument('part', type=int, help='part to solve')
+    parser.add_argument('input', help='input file, or door ID for day 5')
+    parser.add_argument('--options', type=json.loads, default={},
+                        help='JSON object of further keyword arguments for the solver')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='path of the Unix socket')
+    args = parser.parse_args(argv)
+
+    if args.day == 5:
+        response = solve(5, args.part, door_ID=args.input, socket_path=args.socket,
+                         **args.options)
+    else:
+        response = solve(args.day, args.part, input_file=os.path.abspath(args.input),
+                         socket_path=args.socket, **args.options)
+    print(json.dumps(response))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+from solver_service import DEFAULT_SOCKET
+
+async def run_client(requests: asyncio.Queue, latencies: list, errors: list,
+                     socket_path: str=DEFAULT_SOCKET) -> None:
+    """
+    Sends requests from a shared queue to the solver service one at a time over its own
+    connection, recording the latency of each, until the queue is empty.
+
+    Parameters
+    ----------
+    requests : asyncio.Queue
+        Queue of requests to send.
+    latencies : list(float)
+        List to append the latency in seconds of each successful request to.
+    errors : list(dict)
+        List to append every failed response to.
+    socket_path : str, optional
+        Path of the service's Unix socket.
+        The default is DEFAULT_SOCKET.
+
+    Returns
+    -------
+    None.
+
+    """
+    # Allow for long answers, such as Day 2 codes of large files
+    reader, writer = await asyncio.open_unix_connection(socket_path, limit=1 << 26)
+    try:
+        while not requests.empty():
+            request = requests.get_nowait()
+            t0 = time.perf_counter()
+            writer.write(json.dumps(request).encode() + b'\n')
+            await writer.drain()
+            response = json.loads(await reader.readline())
+            if response['status'] == 'ok':
+                latencies.append(time.perf_counter() - t0)
+            else:
+                errors.append(response)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+async def load_test(requests: list, concurrency: int=8, socket_path: str=DEFAULT_SOCKET) -> dict:
+    """
+    Sends a list of requests to the solver service from a number of concurrent clients, and
+    measures the throughput and latency.
+
+    Parameters
+    ----------
+    requests : list(dict)
+        Requests to send (see SolverService).
+    concurrency : int, optional
+        Number of clients sending requests at the same time.
+        The default is 8.
+    socket_path : str, optional
+        Path of the service's Unix socket.
+        The default is DEFAULT_SOCKET.
+
+    Returns
+    -------
+    summary : dict
+        Number of requests and errors, total time in seconds, requests per second, and the mean,
+        median, 95th percentile and maximum latency in seconds.
+
+    """
+    queue = asyncio.Queue()
+    for i, request in enumerate(requests):
+        queue.put_nowait({**request, 'id': i})
+
+    latencies, errors, t0 = [], [], time.perf_counter()
+    await asyncio.gather(*(run_client(queue, latencies, errors, socket_path)
+                           for _ in range(concurrency)))
+    seconds = time.perf_counter() - t0
+
+    latencies.sort()
+    summary = {'requests': len(requests), 'errors': len(errors), 'seconds': seconds,
+               'requests_per_second': len(requests)/seconds}
+    if latencies:
+        summary.update({'latency_mean': sum(latencies)/len(latencies),
+                        'latency_median': latencies[len(latencies)//2],
+                        'latency_p95': latencies[min(len(latencies) - 1,
+                                                     int(0.95*len(latencies)))],
+                        'latency_max': latencies[-1]})
+    if errors:
+        summary['first_error'] = errors[0]['error']
+
+    return summary
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, load testing the solver service with repeated requests for a puzzle
+    and printing a summary as JSON.
+
+    Parameters
+    ----------
+    argv : list(str) or None, optional
+        Command line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+    parser = argparse.ArgumentParser(description='Load test the solver service.')
+    parser.add_argument('day', type=int, help='day to solve')
+    parser.add_argument('parts', type=int, nargs='+', help='parts to solve, in rotation')
+    parser.add_argument('--input', required=True, help='input file, or door ID for day 5')
+    parser.add_argument('--requests', type=int, default=100, help='total number of requests')
+    parser.add_argument('--concurrency', type=int, default=8, help='concurrent clients')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='path of the Unix socket')
+    args = parser.parse_args(argv)
+
+    source = {'door_id': args.input} if args.day == 5 \
+        else {'input_file': os.path.abspath(args.input)}
+    requests = [{'day': args.day, 'part': args.parts[i%len(args.parts)], **source}
+                for i in range(args.requests)]
+    print(json.dumps(asyncio.run(load_test(requests, args.concurrency, args.socket)), indent=2))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import argparse
+import asyncio
+import importlib
+import json
+import multiprocessing
+import os
+import signal
+import tempfile
+import time
+
+from benchmark import discover_solvers
+import input_cache
+
+# Default path of the server's Unix socket
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), 'aoc2016_solver.sock')
+
+def run_solver(name: str, args: tuple, kwargs: dict) -> tuple:
+    """
+    Runs a solver by name and times it, for use in an executor. The solver is looked up in the
+    executor's own process, so this works in worker processes as well as threads, and the time
+    excludes any wait for the executor.
+
+    Parameters
+    ----------
+    name : str
+        Name of the solver, as DayN_PartM.
+    args : tuple
+        Positional arguments of the solver.
+    kwargs : dict
+        Keyword arguments of the solver.
+
+    Returns
+    -------
+    answer
+        The solver's answer.
+    seconds : float
+        Time taken by the solver in seconds.
+
+    """
+    solver = getattr(importlib.import_module(name.split('_')[0]), name)
+    start = time.perf_counter()
+    answer = solver(*args, **kwargs)
+
+    return answer, time.perf_counter() - start
+
+class SolverService:
+    """
+    Class serving solve requests over a Unix socket, one JSON object per line, keeping the solver
+    modules loaded and parsed inputs warm in the input cache between requests. Day 1 to 4 requests
+    are solved one at a time in a single worker thread, so that they share the in-process input
+    cache and the module level keypads safely, while Day 5 searches, which take far longer, are
+    spread over a pool of worker processes, sharing a hit cache which they update under a file
+    lock. Neither blocks the event loop, so requests from any number of clients are accepted while
+    others are being solved.
+
+    A request is an object such as {"id": 1, "day": 4, "part": 1, "input_file": "Day4.txt"}, with
+    "door_id" in place of "input_file" for Day 5, and optionally "options" of further keyword
+    arguments for the solver. The response echoes the id, and gives the status ('ok' or 'error'),
+    the answer or error, the time spent solving and the total time since the request arrived. A
+    request of {"op": "stats"} gives the statistics of the input cache instead.
+    """
+    def __init__(self, socket_path: str=DEFAULT_SOCKET, processes: int=None,
+                 day5_cache: str='Cache/Day5_Hits.json'):
+        """
+        Parameters
+        ----------
+        socket_path : str, optional
+            Path of the Unix socket to listen on.
+            The default is DEFAULT_SOCKET.
+        processes : int or None, optional
+            Number of worker processes for Day 5 searches. If None, one per CPU is used.
+            The default is None.
+        day5_cache : str or None, optional
+            JSON file caching the hits of Day 5 searches (see Day5.find_passwords), unless a
+            request gives its own cache_file option. If None, no cache is used.
+            The default is 'Cache/Day5_Hits.json'.
+
+        """
+        self.socket_path = socket_path
+        self.processes = processes
+        self.day5_cache = day5_cache
+        # Import every solver up front so no request pays for it
+        self.solvers = discover_solvers()
+
+    async def solve(self, request: dict) -> dict:
+        """
+        Solves a single request.
+
+        Parameters
+        ----------
+        request : dict
+            Decoded request.
+
+        Returns
+        -------
+        response : dict
+            Response to send back.
+
+        """
+        response, t0 = {'id': request.get('id')}, time.perf_counter()
+        try:
+            if request.get('op') == 'stats':
+                return {**response, 'status': 'ok', 'stats': input_cache.cache_info()}
+
+            day, part = int(request['day']), int(request['part'])
+            if (name := f'Day{day}_Part{part}') not in self.solvers:
+                raise ValueError(f'Unknown solver {name}')
+            kwargs = dict(request.get('options', {}))
+
+            loop = asyncio.get_running_loop()
+            if day == 5:
+                # Searches run in the process pool, quietly
+                kwargs.setdefault('verbose', False)
+                kwargs.setdefault('cache_file', self.day5_cache)
+                args, executor = (request['door_id'],), self.process_executor
+            else:
+                args, executor = (request['input_file'],), self.thread_executor
+            answer, seconds = await loop.run_in_executor(executor, run_solver, name, args, kwargs)
+            response.update(status='ok', answer=answer, solve_seconds=seconds)
+        except Exception as error:
+            response.update(status='error', error=f'{type(error).__name__}: {error}')
+        response['total_seconds'] = time.perf_counter() - t0
+
+        return response
+
+    async def handle_connection(self, reader, writer) -> None:
+        """
+        Reads requests from a client connection, solving each concurrently and writing each
+        response as soon as it is ready, so responses may arrive out of order and are matched to
+        their requests by id.
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Stream reading from the client.
+        writer : asyncio.StreamWriter
+            Stream writing to the client.
+
+        Returns
+        -------
+        None.
+
+        """
+        async def respond(line):
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as error:
+                response = {'id': None, 'status': 'error', 'error': f'Invalid JSON: {error}'}
+            else:
+                # Answer anything other than an object, such as a list, with an error too
+                if isinstance(request, dict):
+                    response = await self.solve(request)
+                else:
+                    response = {'id': None, 'status': 'error',
+                                'error': 'Request must be a JSON object'}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                if line.strip():
+                    tasks.add(task := asyncio.create_task(respond(line)))
+                    task.add_done_callback(tasks.discard)
+            # Finish answering once the client has sent everything
+            await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    async def serve(self) -> None:
+        """
+        Listens on the Unix socket until interrupted, then removes the socket.
+
+        Returns
+        -------
+        None.
+
+        """
+        # Remove a socket left behind by a previous server
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+        # Start Day 5 workers from a fork server, as workers forked from the service itself would
+        # inherit the sockets of any open connections and keep them open after they are closed
+        with ThreadPoolExecutor(1) as self.thread_executor, \
+            ProcessPoolExecutor(self.processes, multiprocessing.get_context('forkserver')) \
+                as self.process_executor:
+            server = await asyncio.start_unix_server(self.handle_connection, self.socket_path)
+            # Stop cleanly on SIGINT or SIGTERM
+            stop = asyncio.Event()
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                asyncio.get_running_loop().add_signal_handler(signum, stop.set)
+            print(f'Serving on {self.socket_path}', flush=True)
+            try:
+                async with server:
+                    await stop.wait()
+            finally:
+                if os.path.exists(self.socket_path):
+                    os.remove(self.socket_path)
+
+def main(argv: list=None) -> None:
+    """
+    Command line interface, running the solver service.
+
+    Parameters
+    ----------
+    argv : list(str) or None, optional
+        Command line arguments. If None, sys.argv is used.
+        The default is None.
+
+    Returns
+    -------
+    None.
+
+    """
+    parser = argparse.ArgumentParser(description='Serve solve requests over a Unix socket.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET, help='path of the Unix socket')
+    parser.add_argument('--processes', type=int,
+                        help='worker processes for Day 5, by default one per CPU')
+    parser.add_argument('--day5-cache', default='Cache/Day5_Hits.json',
+                        help="hit cache shared by Day 5 searches, or 'none' for no cache")
+    args = parser.parse_args(argv)
+
+    day5_cache = None if args.day5_cache.lower() == 'none' else args.day5_cache
+    asyncio.run(SolverService(args.socket, args.processes, day5_cache).serve())
+
+if __name__ == '__main__':
+    main()